@@ -0,0 +1,116 @@
+"""
+Benchmark: peak memory of the copy-free pipeline stages.
+
+Runs the task1 post-processing chain (convert_col_to_cest ->
+drop_na_get_final -> create_custom_ordering -> imbalance_sign) and the
+task2 fuel chain (add_fuel_column -> split_wind_solar) twice with the
+current helpers. One run starts every stage with a defensive df.copy(),
+as the pipeline did before. The other hands frames over without copying,
+as full_run_and_plot / run_part2_wind_solar do (owned=True). Everything
+else is identical, so the difference is the copies alone. Inputs are
+synthetic multi-day payloads from bmrs_synthetic.py. The script reports
+wall time and tracemalloc peak for each run and checks that both give
+the same frames.
+
+Usage:
+    python benchmarks/bench_copy_free.py --days 30 365 --revisions 48
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bmrs_synthetic as synth  # noqa: E402
+import task1  # noqa: E402
+import task2  # noqa: E402
+
+
+START = "2025-01-01"
+
+
+# =========================
+# Chains
+# =========================
+
+def imbalance_chain(copy):
+    entry = (lambda df: df.copy()) if copy else (lambda df: df)
+
+    def run(df):
+        df = task1.convert_col_to_cest(entry(df), owned=True)
+        final_df = task1.drop_na_get_final(entry(df))
+        final_df, _ = task1.create_custom_ordering(entry(final_df), owned=True)
+        return (task1.imbalance_sign(entry(final_df), owned=True),)
+    return run
+
+
+def fuel_chain(copy):
+    entry = (lambda df: df.copy()) if copy else (lambda df: df)
+
+    def run(df):
+        return task2.split_wind_solar(entry(task2.add_fuel_column(entry(df))))
+    return run
+
+
+CHAINS = {
+    "imbalance": (imbalance_chain(copy=True), imbalance_chain(copy=False)),
+    "fuel": (fuel_chain(copy=True), fuel_chain(copy=False)),
+}
+
+
+def _response(body):
+    return types.SimpleNamespace(content=body)
+
+
+def chain_input(name, days, revisions):
+    if name == "imbalance":
+        return task1.req_to_df(_response(synth.evolution_payload(START, days, revisions)))
+    body = synth.wind_solar_actual_payload(START, days, synth.PSR_MIXES["mixed"])
+    return task2.actuals_req_to_df(_response(body))
+
+
+def measure(fn, df, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(df)
+        times.append(time.perf_counter() - t0)
+
+    tracemalloc.start()
+    out = fn(df)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(times), peak, out
+
+
+def same_result(a, b):
+    return all(x.equals(y) for x, y in zip(a, b))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, nargs="+", default=[30, 365])
+    parser.add_argument("--revisions", type=int, default=48)
+    parser.add_argument("--chains", nargs="+", choices=sorted(CHAINS), default=sorted(CHAINS))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'chain':<10} {'days':>5} {'rows':>9} {'copying (ms)':>13} {'copy-free (ms)':>15} "
+          f"{'copying peak (MB)':>18} {'copy-free peak (MB)':>20}  equal")
+    for name in args.chains:
+        copying, copy_free = CHAINS[name]
+        for days in args.days:
+            df = chain_input(name, days, args.revisions)
+            t_old, peak_old, out_old = measure(copying, df, args.repeat)
+            t_new, peak_new, out_new = measure(copy_free, df, args.repeat)
+            print(
+                f"{name:<10} {days:>5} {len(df):>9} {t_old * 1e3:>13.1f} {t_new * 1e3:>15.1f} "
+                f"{peak_old / 1e6:>18.1f} {peak_new / 1e6:>20.1f}  {same_result(out_old, out_new)}"
+            )
+
+
+if __name__ == "__main__":
+    main()
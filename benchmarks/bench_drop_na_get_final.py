@@ -0,0 +1,83 @@
+"""
+Benchmark: latest-forecast-per-SP selection in task1.drop_na_get_final.
+
+Compares the current linear selection (task1.latest_per_key) against the
+original global sort + groupby().tail(1), on synthetic evolution data from
+bmrs_synthetic.py, and checks both give the same rows.
+
+Usage:
+    python benchmarks/bench_drop_na_get_final.py --days 1 7 30 90 --revisions 48 96
+"""
+import argparse
+import datetime as dt
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bmrs_synthetic as synth  # noqa: E402
+import task1  # noqa: E402
+
+
+def legacy_drop_na_get_final(df):
+    # Original implementation, kept here as the benchmark baseline
+    df_valid = df.dropna(subset=["indicatedImbalance"]).copy()
+    df_valid = df_valid.sort_values("publishTime_cest")
+    final_df = (
+        df_valid
+        .groupby(["settlementDate", "settlementPeriod"])
+        .tail(1)
+        .reset_index(drop=True)
+    )
+    return final_df
+
+
+def build_frame(days, revisions, start="2025-01-01"):
+    start_obj = dt.date.fromisoformat(start)
+    rows = []
+    for i in range(days):
+        rows.extend(synth.evolution_rows(start_obj + dt.timedelta(days=i), revisions=revisions))
+    df = pd.DataFrame(rows)
+    return task1.convert_col_to_cest(df)
+
+
+def best_of(fn, df, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn(df)
+        times.append(time.perf_counter() - t0)
+    return min(times), out
+
+
+def same_result(a, b):
+    key = ["settlementDate", "settlementPeriod"]
+    a = a.sort_values(key).reset_index(drop=True)
+    b = b.sort_values(key).reset_index(drop=True)
+    return a.equals(b)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, nargs="+", default=[1, 7, 30, 90])
+    parser.add_argument("--revisions", type=int, nargs="+", default=[48])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'days':>5} {'revs':>5} {'rows':>10} {'legacy (ms)':>12} {'latest_per_key (ms)':>20} {'speed-up':>9}  equal")
+    for revisions in args.revisions:
+        for days in args.days:
+            df = build_frame(days, revisions)
+            t_old, out_old = best_of(legacy_drop_na_get_final, df, args.repeat)
+            t_new, out_new = best_of(task1.drop_na_get_final, df, args.repeat)
+            print(
+                f"{days:>5} {revisions:>5} {len(df):>10} {t_old * 1e3:>12.1f} "
+                f"{t_new * 1e3:>20.1f} {t_old / t_new:>8.1f}x  {same_result(out_old, out_new)}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark: JSON payload -> DataFrame ingestion.
+
+Compares the original `pd.DataFrame(r.json()["data"])` conversion (plus
+the timestamp parsing it leaves to later stages) with the typed paths in
+bmrs_frames: the default (orjson when installed) and low_memory (ijson
+streaming when installed), on synthetic evolution payloads. Reports parse
+time, peak traced memory during parsing and the resulting frame's size.
+
+Usage:
+    python benchmarks/bench_ingestion.py --days 1 30 90 --revisions 48
+"""
+import argparse
+import datetime as dt
+import json
+import os
+import sys
+import time
+import tracemalloc
+import types
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bmrs_frames  # noqa: E402
+import bmrs_synthetic as synth  # noqa: E402
+
+
+def legacy_ingest(body):
+    df = pd.DataFrame(json.loads(body)["data"])
+    # The untyped frame still needs its timestamps parsed downstream
+    for col in ("startTime", "publishTime"):
+        df[col] = pd.to_datetime(df[col], utc=True)
+    return df
+
+
+def typed_ingest(body):
+    return bmrs_frames.response_to_df(types.SimpleNamespace(content=body), bmrs_frames.EVOLUTION_SCHEMA)
+
+
+def low_memory_ingest(body):
+    return bmrs_frames.response_to_df(
+        types.SimpleNamespace(content=body), bmrs_frames.EVOLUTION_SCHEMA, low_memory=True
+    )
+
+
+PATHS = (("legacy", legacy_ingest), ("typed", typed_ingest), ("low_mem", low_memory_ingest))
+
+
+def build_payload(days, revisions, start="2025-01-01"):
+    start_obj = dt.date.fromisoformat(start)
+    rows = []
+    for i in range(days):
+        rows.extend(synth.evolution_rows(start_obj + dt.timedelta(days=i), revisions=revisions))
+    return json.dumps({"data": rows}).encode("utf-8")
+
+
+def measure(fn, body, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        df = fn(body)
+        best = min(best, time.perf_counter() - t0)
+
+    tracemalloc.start()
+    df = fn(body)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return best, peak, df.memory_usage(deep=True).sum()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, nargs="+", default=[1, 30, 90])
+    parser.add_argument("--revisions", type=int, default=48)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    decoder = "orjson" if bmrs_frames.orjson is not None else "json"
+    streaming = "ijson" if bmrs_frames.ijson is not None else "unavailable, same as typed"
+    print(f"typed decoder: {decoder}; low_mem decoder: {streaming}")
+    print(f"{'days':>5} {'MB':>7} {'path':>7} {'parse (ms)':>11} {'peak (MB)':>10} {'frame (MB)':>11}")
+    for days in args.days:
+        body = build_payload(days, args.revisions)
+        for name, fn in PATHS:
+            t, peak, size = measure(fn, body, args.repeat)
+            print(f"{days:>5} {len(body) / 1e6:>7.1f} {name:>7} {t * 1e3:>11.1f} {peak / 1e6:>10.1f} {size / 1e6:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+"""
+Benchmark suite: the public pipeline functions of task1.py / task2.py.
+
+Times req_to_df, convert_col_to_cest, drop_na_get_final,
+prepare_wind_solar_merged, plot_diff and plot_forecast_vs_actual_with_table
+on synthetic payloads from bmrs_synthetic.py. The payloads cover 1 day to
+a year or more, with a configurable number of revisions per SP and a
+configurable psrType mix.
+
+Every run appends one JSON line to --results (timings, row counts, peak
+traced memory, git commit and library versions). --compare checks the new
+timings against an earlier run and flags functions that got slower by
+more than --threshold.
+
+Figures are built but not written or shown (headless, no outputs), so the
+plot timings are figure construction only. plot_diff always gets one
+local day (the last of the payload), like the auto-update loop.
+
+Usage:
+    python benchmarks/bench_pipeline.py --days 1 30 365 --revisions 48 --psr-mix standard mixed
+    python benchmarks/bench_pipeline.py --days 1 30 --label my-change --compare latest
+"""
+import argparse
+import datetime as dt
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+import types
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import bmrs_export  # noqa: E402
+import bmrs_frames  # noqa: E402
+import bmrs_synthetic as synth  # noqa: E402
+import task1  # noqa: E402
+import task2  # noqa: E402
+
+
+DEFAULT_RESULTS = os.path.join(ROOT, "benchmarks", "results.jsonl")
+START = "2025-01-01"
+IMBALANCE_FUNCTIONS = ("req_to_df", "convert_col_to_cest", "drop_na_get_final", "plot_diff")
+WIND_SOLAR_FUNCTIONS = ("prepare_wind_solar_merged", "plot_forecast_vs_actual_with_table")
+FUNCTIONS = IMBALANCE_FUNCTIONS + WIND_SOLAR_FUNCTIONS
+
+
+# =========================
+# Inputs
+# =========================
+
+def _response(body):
+    return types.SimpleNamespace(content=body)
+
+
+def _final(body):
+    df = task1.convert_col_to_cest(task1.req_to_df(_response(body)))
+    final_df, order_str = task1.create_custom_ordering(task1.drop_na_get_final(df))
+    return task1.imbalance_sign(final_df), order_str
+
+
+def _local_day(final_df, date):
+    # Rows of one Europe/Berlin local day, as the auto-update loop holds them
+    day = (dt.date.fromisoformat(str(date)) - dt.date(1970, 1, 1)).days
+    return final_df[final_df["periodKey"].to_numpy() // bmrs_frames.PERIOD_KEY_BASE == day]
+
+
+def imbalance_inputs(days, revisions):
+    """
+    Inputs of every task1 stage for `days` days of evolution data.
+
+    plot_diff compares two snapshots of one local day (the last one), as
+    the auto-update loop does; the previous snapshot leaves out that day's
+    final two publishes, as a poll would see it. Multi-day frames would
+    turn its localPeriod merge into a cross join that production never
+    builds.
+    """
+    body = synth.evolution_payload(START, days, revisions)
+    df_raw = task1.req_to_df(_response(body))
+    df_cest = task1.convert_col_to_cest(df_raw)
+
+    last_date = synth.settlement_dates(START, days)[-1]
+    cutoff = synth.settlement_day_start(last_date) - 2 * synth.HALF_HOUR
+    new_df, _ = _final(body)
+    prev_df, _ = _final(synth.evolution_payload(START, days, revisions, published_before=cutoff))
+
+    return {
+        "body": body,
+        "df_raw": df_raw,
+        "df_cest": df_cest,
+        "prev_df": _local_day(prev_df, last_date),
+        "new_df": _local_day(new_df, last_date),
+        "order_str": task1.settlement_period_order(last_date),
+    }
+
+
+def wind_solar_inputs(days, psr_types):
+    forecast = task2.forecast_req_to_df(_response(synth.wind_solar_forecast_payload(START, days, psr_types)))
+    actuals = task2.actuals_req_to_df(_response(synth.wind_solar_actual_payload(START, days, psr_types)))
+    merged = task2.prepare_wind_solar_merged(forecast, actuals)
+    df_wind, df_solar = task2.split_wind_solar(merged)
+    return {
+        "forecast": forecast,
+        "actuals": actuals,
+        "plot_df": df_wind if not df_wind.empty else df_solar,
+        "fuel": "Wind" if not df_wind.empty else "Solar",
+    }
+
+
+def imbalance_cases(days, revisions):
+    """
+    (function name, zero-argument call, rows in) for the task1 functions.
+    """
+    imb = imbalance_inputs(days, revisions)
+    return [
+        ("req_to_df", lambda: task1.req_to_df(_response(imb["body"])), len(imb["df_raw"])),
+        ("convert_col_to_cest", lambda: task1.convert_col_to_cest(imb["df_raw"]), len(imb["df_raw"])),
+        ("drop_na_get_final", lambda: task1.drop_na_get_final(imb["df_cest"]), len(imb["df_cest"])),
+        ("plot_diff", lambda: task1.plot_diff(imb["prev_df"], imb["new_df"], imb["order_str"]),
+         len(imb["new_df"])),
+    ]
+
+
+def wind_solar_cases(days, psr_mix):
+    """
+    (function name, zero-argument call, rows in) for the task2 functions.
+    """
+    ws = wind_solar_inputs(days, synth.PSR_MIXES[psr_mix])
+    return [
+        ("prepare_wind_solar_merged", lambda: task2.prepare_wind_solar_merged(ws["forecast"], ws["actuals"]),
+         len(ws["forecast"]) + len(ws["actuals"])),
+        ("plot_forecast_vs_actual_with_table",
+         lambda: task2.plot_forecast_vs_actual_with_table(ws["plot_df"], fuel_label=ws["fuel"]),
+         len(ws["plot_df"])),
+    ]
+
+
+# =========================
+# Measurement
+# =========================
+
+def measure(call, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        call()
+        times.append(time.perf_counter() - t0)
+
+    tracemalloc.start()
+    call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return min(times), statistics.median(times), peak
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def run_suite(days_list, revisions_list, psr_mixes, functions, repeat):
+    # Evolution payloads vary with revisions, wind/solar ones with the psrType mix
+    groups = []
+    for days in days_list:
+        if set(functions) & set(IMBALANCE_FUNCTIONS):
+            groups += [(days, revisions, None, imbalance_cases, (days, revisions)) for revisions in revisions_list]
+        if set(functions) & set(WIND_SOLAR_FUNCTIONS):
+            groups += [(days, None, mix, wind_solar_cases, (days, mix)) for mix in psr_mixes]
+
+    results = []
+    print(f"{'function':<36} {'days':>5} {'revs':>5} {'mix':>8} {'rows':>9} "
+          f"{'best (ms)':>10} {'median (ms)':>12} {'peak (MB)':>10}")
+    for days, revisions, psr_mix, make_cases, case_args in groups:
+        for name, call, rows in make_cases(*case_args):
+            if name not in functions:
+                continue
+            best, median, peak = measure(call, repeat)
+            results.append({
+                "function": name,
+                "days": days,
+                "revisions": revisions,
+                "psr_mix": psr_mix,
+                "rows": rows,
+                "best_s": best,
+                "median_s": median,
+                "peak_mb": peak / 1e6,
+            })
+            print(f"{name:<36} {days:>5} {revisions or '':>5} {psr_mix or '':>8} {rows:>9} "
+                  f"{best * 1e3:>10.1f} {median * 1e3:>12.1f} {peak / 1e6:>10.1f}")
+    return results
+
+
+# =========================
+# Results store
+# =========================
+
+def load_results(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def save_results(path, record):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def find_baseline(previous, ref):
+    """
+    Earlier run to compare with: 'latest', a label or a git commit.
+    """
+    if not previous:
+        return None
+    if ref == "latest":
+        return previous[-1]
+    for record in reversed(previous):
+        if ref in (record.get("label"), record.get("git_commit")):
+            return record
+    return None
+
+
+def compare(baseline, results, threshold):
+    """
+    Print best-time ratios against `baseline` for matching cases and
+    return the number of regressions (slower by more than threshold).
+    """
+    key = ("function", "days", "revisions", "psr_mix")
+    before = {tuple(r[k] for k in key): r for r in baseline["results"]}
+
+    print(f"\nCompared with {baseline.get('label') or baseline.get('git_commit')} ({baseline['timestamp']}):")
+    regressions = matched = 0
+    for r in results:
+        old = before.get(tuple(r[k] for k in key))
+        if old is None:
+            continue
+        ratio = r["best_s"] / old["best_s"] if old["best_s"] > 0 else np.nan
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif ratio < 1 - threshold:
+            flag = "  faster"
+        print(f"  {r['function']:<36} {r['days']:>5}d {r['revisions'] or '':>4} {r['psr_mix'] or '':>8} "
+              f"{old['best_s'] * 1e3:>9.1f} → {r['best_s'] * 1e3:>9.1f} ms ({ratio:.2f}x){flag}")
+        matched += 1
+    if not matched:
+        print("  no cases in common")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, nargs="+", default=[1, 7, 30, 365])
+    parser.add_argument("--revisions", type=int, nargs="+", default=[48],
+                        help="Forecast revisions per settlement period (default: 48).")
+    parser.add_argument("--psr-mix", nargs="+", choices=sorted(synth.PSR_MIXES), default=["standard"],
+                        help="psrType sets for the wind/solar payloads (default: standard).")
+    parser.add_argument("--functions", nargs="+", choices=FUNCTIONS, default=list(FUNCTIONS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--results", default=DEFAULT_RESULTS,
+                        help="JSON-lines file the run is appended to (default: benchmarks/results.jsonl).")
+    parser.add_argument("--label", default=None, help="Name for this run in the results file.")
+    parser.add_argument("--compare", metavar="REF", default=None,
+                        help="Compare with an earlier run: 'latest', a --label or a git commit.")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Slow-down counted as a regression by --compare (default: 0.10 = 10%%).")
+    parser.add_argument("--no-save", dest="save", action="store_false",
+                        help="Do not append this run to --results.")
+    args = parser.parse_args()
+
+    bmrs_export.configure(headless=True, formats=())
+
+    previous = load_results(args.results)
+    results = run_suite(args.days, args.revisions, args.psr_mix, args.functions, args.repeat)
+
+    record = {
+        "timestamp": dt.datetime.now(dt.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "label": args.label,
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "repeat": args.repeat,
+        "results": results,
+    }
+    if args.save:
+        save_results(args.results, record)
+        print(f"\nResults appended to {args.results}")
+
+    if args.compare:
+        baseline = find_baseline(previous, args.compare)
+        if baseline is None:
+            print(f"\nNo earlier run matching {args.compare!r} in {args.results}")
+        elif compare(baseline, results, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
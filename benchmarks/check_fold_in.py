@@ -0,0 +1,88 @@
+"""
+Check: incremental LocalDayState.fold_in against a full rebuild.
+
+Replays one local day of synthetic evolution data (bmrs_synthetic.py)
+as a live poll loop would see it. The state starts from whatever was
+published by a first watermark. Each later step folds in everything
+published so far, and the result must match running the full task1
+pipeline (req_to_df -> convert_col_to_cest -> drop_na_get_final ->
+create_custom_ordering -> imbalance_sign) over the same records. The
+default days cover a 48-period day and both clock changes (46 and 50
+periods).
+
+Usage:
+    python benchmarks/check_fold_in.py --dates 2025-11-11 2025-03-30 2025-10-26 --step 3
+"""
+import argparse
+import os
+import sys
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bmrs_frames  # noqa: E402
+import bmrs_synthetic as synth  # noqa: E402
+import task1  # noqa: E402
+
+
+def day_records(date, revisions):
+    rows = []
+    for settlement_date, periods in bmrs_frames.LocalDay(date).periods:
+        rows.extend(synth.evolution_rows(settlement_date, periods, revisions=revisions))
+    return rows
+
+
+def rebuild(records):
+    # Same stages as task1.full_run_and_plot, without the fetch
+    body = synth.to_payload(records)
+    df = task1.convert_col_to_cest(task1.req_to_df(types.SimpleNamespace(content=body)))
+    final_df = task1.drop_na_get_final(df)
+    final_df, _ = task1.create_custom_ordering(final_df)
+    return task1.imbalance_sign(final_df)
+
+
+def same_rows(a, b):
+    # fold_in keeps publish order, the rebuild keeps drop_na_get_final's;
+    # compare the rows per local-day position
+    if list(a.columns) != list(b.columns) or len(a) != len(b):
+        return False
+    a = a.sort_values("periodKey").reset_index(drop=True)
+    b = b.sort_values("periodKey").reset_index(drop=True)
+    return a.equals(b)
+
+
+def check_day(date, revisions, step):
+    records = day_records(date, revisions)
+    publishes = sorted({row["publishTime"] for row in records})
+    # Start before the first publish (empty state) and from part-way
+    # through the day, then fold in every `step`-th publish after that
+    ok = True
+    for start in ("", publishes[len(publishes) // 3]):
+        state = task1.LocalDayState(rebuild([r for r in records if r["publishTime"] <= start]))
+        for cutoff in [p for p in publishes if p > start][::step] + [publishes[-1]]:
+            seen = [r for r in records if r["publishTime"] <= cutoff]
+            state.fold_in(seen)
+            if not same_rows(state.final_df, rebuild(seen)):
+                print(f" MISMATCH {date}: start {start}, cutoff {cutoff}")
+                ok = False
+    return ok, len(publishes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dates", nargs="+", default=["2025-11-11", "2025-03-30", "2025-10-26"])
+    parser.add_argument("--revisions", type=int, default=8)
+    parser.add_argument("--step", type=int, default=3)
+    args = parser.parse_args()
+
+    failed = False
+    for date in args.dates:
+        ok, n_publishes = check_day(date, args.revisions, args.step)
+        n_periods = bmrs_frames.LocalDay(date).n_periods
+        print(f"{date}  {n_periods} periods  {n_publishes} publishes  {'ok' if ok else 'FAILED'}")
+        failed = failed or not ok
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
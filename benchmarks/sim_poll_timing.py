@@ -0,0 +1,97 @@
+"""
+Simulation: learned vs fixed poll timing (bmrs_polling.PublishLagModel).
+
+Replays `--revisions` forecast publishes at a fixed cadence. Each one
+becomes available after a random lag drawn uniformly from
+[--lag-min, --lag-max] seconds (seeded). Polls follow the same schedule
+as task1.ImbalanceWatch on a simulated clock. The learned schedule uses
+--poll-quantiles and learns the cadence and lag. The fixed one uses the
+default --retry-increments (30/60/120 s) with learning off, as with
+--fixed-poll. For each it reports polls per revision and the mean and
+p90 delay from a revision becoming available to the poll that saw it.
+
+Usage:
+    python benchmarks/sim_poll_timing.py --revisions 200 --lag-min 60 --lag-max 180 --seed 0
+"""
+import argparse
+import datetime as dt
+import os
+import random
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bmrs_polling  # noqa: E402
+
+
+START = dt.datetime(2025, 11, 11, tzinfo=dt.timezone.utc)
+
+
+def simulate(model, revisions, cadence_s, lags):
+    """
+    Drive `model` through `revisions` publishes whose availability lags
+    are `lags` (seconds). Returns (polls per revision, pickup delays).
+    """
+    cadence = dt.timedelta(seconds=cadence_s)
+    # Watch starts just after revision 0 was picked up
+    watermark = START
+    model.observe_publishes([watermark])
+    last_poll_at = START + dt.timedelta(seconds=lags[0])
+
+    polls, delays = 0, []
+    for k in range(1, revisions + 1):
+        published = START + k * cadence
+        available = published + dt.timedelta(seconds=lags[k])
+        expected = model.expected_publish(watermark)
+
+        now, attempt = last_poll_at, 0
+        while True:
+            when, attempt = model.next_poll(expected, attempt, now)
+            now = when
+            polls += 1
+            if now >= available:
+                break
+            last_poll_at = now
+            attempt += 1
+
+        model.observe_arrival(published, now, last_poll_at)
+        last_poll_at = now
+        watermark = published
+        delays.append((now - available).total_seconds())
+
+    return polls / revisions, np.array(delays)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--revisions", type=int, default=200)
+    parser.add_argument("--cadence-minutes", type=float, default=30)
+    parser.add_argument("--lag-min", type=float, default=60)
+    parser.add_argument("--lag-max", type=float, default=180)
+    parser.add_argument("--poll-quantiles", type=float, nargs="+", default=list(bmrs_polling.DEFAULT_QUANTILES))
+    parser.add_argument("--retry-increments", type=float, nargs="+", default=[30, 60, 120])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    lags = [rng.uniform(args.lag_min, args.lag_max) for _ in range(args.revisions + 1)]
+    cadence_s = args.cadence_minutes * 60
+    fallback = np.cumsum([0.0] + args.retry_increments)
+
+    schedules = {
+        "fixed": bmrs_polling.PublishLagModel(cadence_s, fallback, learn=False),
+        "learned": bmrs_polling.PublishLagModel(cadence_s, fallback, quantiles=args.poll_quantiles),
+    }
+
+    print(f"{args.revisions} revisions, lag {args.lag_min:.0f}-{args.lag_max:.0f} s, seed {args.seed}")
+    print(f"{'schedule':<9} {'polls/revision':>15} {'mean delay (s)':>15} {'p90 delay (s)':>14}")
+    for name, model in schedules.items():
+        per_revision, delays = simulate(model, args.revisions, cadence_s, lags)
+        print(f"{name:<9} {per_revision:>15.1f} {delays.mean():>15.0f} {np.quantile(delays, 0.9):>14.0f}")
+    print(f"learned: {schedules['learned'].summary()}")
+
+
+if __name__ == "__main__":
+    main()
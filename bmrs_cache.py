@@ -0,0 +1,190 @@
+"""
+On-disk cache of raw BMRS response bodies.
+
+Entries are keyed by the fully prepared request URL (endpoint + query
+params) and stored gzip-compressed, one file per entry. Each entry has an
+optional expiry time; the cache as a whole is bounded in size and evicts
+least-recently-used entries (file mtime is bumped on every hit).
+
+Expiry policy lives in `ttl_for_date`: data for settlement dates that have
+fully elapsed never changes, so it is cached forever, while anything for
+today/tomorrow only gets a short TTL.
+"""
+import datetime as dt
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+import requests as rq
+
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "BMRS_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "bmrs_http"),
+)
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# TTL for data that may still be revised. Kept below the shortest
+# auto-update retry (30 s) so polling never sees a stale answer.
+RECENT_TTL_S = 20
+
+# A settlement date is treated as final once this long has passed since
+# the end of that UTC day (covers the BST offset and late publications).
+SETTLED_AFTER = dt.timedelta(hours=3)
+
+FOREVER = None
+
+
+def ttl_for_date(date, now=None):
+    """
+    Cache TTL in seconds for data belonging to settlement date `date`
+    ('YYYY-MM-DD'): FOREVER (None) for settled days, RECENT_TTL_S otherwise.
+    """
+    now = now or dt.datetime.now(dt.timezone.utc)
+    day_end = dt.datetime.strptime(date, "%Y-%m-%d").replace(tzinfo=dt.timezone.utc) + dt.timedelta(days=1)
+
+    if now >= day_end + SETTLED_AFTER:
+        return FOREVER
+    return RECENT_TTL_S
+
+
+def cache_key(url, params=None):
+    """
+    Hash of the prepared request URL, so identical endpoint + params map
+    to the same entry regardless of how params were passed.
+    """
+    prepared = rq.Request("GET", url, params=params).prepare()
+    return hashlib.sha256(prepared.url.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Size-bounded LRU cache of response bodies on disk.
+
+    File layout: `<key>.gz` containing one JSON metadata line followed by
+    the raw response body.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = int(max_bytes)
+        self._lock = threading.Lock()
+        self._size = None
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + ".gz")
+
+    def _entries(self):
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for e in it:
+                if e.name.endswith(".gz") and e.is_file():
+                    st = e.stat()
+                    entries.append((st.st_mtime, st.st_size, e.path))
+        return entries
+
+    def size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def get(self, key):
+        """
+        Return (meta, body) for a live entry, or None on miss/expiry.
+        """
+        path = self._path(key)
+        try:
+            with gzip.open(path, "rb") as f:
+                blob = f.read()
+        except (FileNotFoundError, OSError, EOFError):
+            return None
+
+        header, _, body = blob.partition(b"\n")
+        try:
+            meta = json.loads(header)
+        except ValueError:
+            self._remove(path)
+            return None
+
+        expires_at = meta.get("expires_at")
+        if expires_at is not None and time.time() >= expires_at:
+            self._remove(path)
+            return None
+
+        # LRU bookkeeping: most recently used = newest mtime
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        return meta, body
+
+    def put(self, key, body, meta, ttl=FOREVER):
+        meta = dict(meta)
+        meta["stored_at"] = time.time()
+        meta["expires_at"] = None if ttl is FOREVER else meta["stored_at"] + ttl
+
+        path = self._path(key)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp, "wb", compresslevel=6) as f:
+            f.write(json.dumps(meta).encode("utf-8"))
+            f.write(b"\n")
+            f.write(body)
+
+        with self._lock:
+            # Overwriting an entry (e.g. a re-cached short-TTL response)
+            # only grows the cache by the size difference
+            try:
+                old_size = os.path.getsize(path)
+            except OSError:
+                old_size = 0
+            os.replace(tmp, path)
+            if self._size is None:
+                self._size = self.size()
+            else:
+                self._size += os.path.getsize(path) - old_size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # Drop least-recently-used entries until 90% of the budget is free
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+
+        for _, size, path in entries:
+            if total <= target:
+                break
+            self._remove(path)
+            total -= size
+
+        self._size = total
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def clear(self):
+        with self._lock:
+            for _, _, path in self._entries():
+                self._remove(path)
+            self._size = 0
+
+
+def response_from_cache(meta, body):
+    """
+    Rebuild a requests.Response from a cached entry so callers can use
+    .status_code / .json() / .headers exactly as for a live response.
+    """
+    r = rq.Response()
+    r.status_code = meta.get("status", 200)
+    r._content = body
+    r.headers.update(meta.get("headers", {}))
+    r.url = meta.get("url", "")
+    r.encoding = meta.get("encoding") or "utf-8"
+    r.elapsed = dt.timedelta(0)
+    return r
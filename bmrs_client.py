@@ -0,0 +1,682 @@
+"""
+Shared HTTP client for the BMRS Insights API.
+
+All fetch functions in task1.py / task2.py go through `get()` so that they
+share one pooled, keep-alive `requests.Session` instead of paying a fresh
+TCP + TLS handshake on every call (and on every auto-update poll / retry).
+
+Every request is timed and tagged with whether it had to open a new
+connection, so the saving from connection reuse can be inspected with
+`timing_summary()` / `print_timing_summary()`.
+
+Callers that pass `cache_ttl` get transparent on-disk caching of the raw
+response body (see bmrs_cache.py); a cache hit costs no network round-trip.
+
+`get_with_retry()` wraps `get()` in the shared RetryPolicy: timeouts,
+connection errors, 429 and 5xx are retried with jittered exponential
+backoff (or after Retry-After); any other 4xx fails at once.
+"""
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import requests as rq
+from requests.adapters import HTTPAdapter
+
+import bmrs_cache
+
+
+DEFAULT_BASE_URL = "https://data.elexon.co.uk/bmrs/api/v1"
+DEFAULT_POOL_SIZE = 10
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_RATE_LIMIT = 10.0     # requests/second across all threads
+DEFAULT_BURST = 10
+DEFAULT_CONNECT_TIMEOUT_S = 5.0
+DEFAULT_TIMEOUT_S = 30.0      # read timeout: max silence while waiting for a response
+TIMING_LOG_SIZE = 10000
+NO_CACHE = False
+
+_base_url = os.environ.get("BMRS_BASE_URL", DEFAULT_BASE_URL)
+_session = None
+_pool_size = DEFAULT_POOL_SIZE
+_lock = threading.Lock()
+_timings = deque(maxlen=TIMING_LOG_SIZE)
+_rate_limiter = None     # installed below once RateLimiter is defined
+_timeout = (DEFAULT_CONNECT_TIMEOUT_S, DEFAULT_TIMEOUT_S)
+_validators = {}
+_cache = None
+_cache_enabled = True
+_cache_dir = bmrs_cache.DEFAULT_CACHE_DIR
+_cache_max_bytes = bmrs_cache.DEFAULT_MAX_BYTES
+
+
+# =========================
+# Endpoint configuration
+# =========================
+
+def set_base_url(base_url):
+    """
+    Point every fetcher at a different API root, e.g. the local stand-in
+    from mock_bmrs_server.py ("http://127.0.0.1:8080/bmrs/api/v1").
+    """
+    global _base_url
+    _base_url = (base_url or DEFAULT_BASE_URL).rstrip("/")
+
+
+def api_url(path):
+    """
+    Full URL for an endpoint path such as "/forecast/indicated/day-ahead/evolution".
+    """
+    return _base_url.rstrip("/") + path
+
+
+# =========================
+# Session management
+# =========================
+
+def _build_session(pool_size):
+    session = rq.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "Accept": "application/json",
+        "Accept-Encoding": "gzip, deflate",
+        "Connection": "keep-alive",
+    })
+    return session
+
+
+def configure(pool_size=DEFAULT_POOL_SIZE):
+    """
+    (Re)build the shared session with the given connection pool size.
+
+    pool_size is the number of keep-alive connections kept per host; it
+    should be at least the number of requests issued concurrently.
+    """
+    global _session, _pool_size
+    with _lock:
+        if _session is not None:
+            _session.close()
+        _pool_size = int(pool_size)
+        _session = _build_session(_pool_size)
+    return _session
+
+
+def set_timeout(read_s=DEFAULT_TIMEOUT_S, connect_s=DEFAULT_CONNECT_TIMEOUT_S):
+    """
+    Per-request timeouts applied by `get()` unless a call passes its own
+    `timeout`. None disables the corresponding limit.
+    """
+    global _timeout
+    _timeout = (connect_s, read_s)
+
+
+def get_session():
+    """
+    Return the shared session, creating it on first use.
+    """
+    global _session
+    with _lock:
+        if _session is None:
+            _session = _build_session(_pool_size)
+        return _session
+
+
+def close():
+    """
+    Close the shared session and drop all pooled connections.
+    """
+    global _session
+    with _lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def _connection_count(session, url):
+    # Number of connections the urllib3 pools behind this adapter have ever
+    # opened. Comparing it before/after a request tells us if a handshake
+    # happened (best effort when requests run concurrently).
+    try:
+        pools = session.get_adapter(url).poolmanager.pools
+        return sum(pools[key].num_connections for key in pools.keys())
+    except Exception:
+        return None
+
+
+# =========================
+# Response cache
+# =========================
+
+def configure_cache(
+    enabled=True,
+    cache_dir=bmrs_cache.DEFAULT_CACHE_DIR,
+    max_bytes=bmrs_cache.DEFAULT_MAX_BYTES,
+    recent_ttl=None,
+):
+    """
+    Enable/disable the on-disk response cache and set its location, size
+    budget and the TTL used for not-yet-settled dates.
+    """
+    global _cache, _cache_enabled, _cache_dir, _cache_max_bytes
+    with _lock:
+        _cache_enabled = bool(enabled)
+        _cache_dir = cache_dir
+        _cache_max_bytes = int(max_bytes)
+        _cache = None
+    if recent_ttl is not None:
+        bmrs_cache.RECENT_TTL_S = recent_ttl
+
+
+def get_cache():
+    """
+    Return the shared ResponseCache, or None when caching is disabled.
+    """
+    global _cache
+    with _lock:
+        if not _cache_enabled:
+            return None
+        if _cache is None:
+            _cache = bmrs_cache.ResponseCache(_cache_dir, _cache_max_bytes)
+        return _cache
+
+
+# =========================
+# Rate limiting
+# =========================
+
+class RateLimiter:
+    """
+    Thread-safe token bucket: on average at most `rate` requests per
+    second, with bursts of up to `burst` back-to-back requests after an
+    idle spell.
+
+    Callers that find the bucket empty reserve the next token and sleep
+    outside the lock, so waiting threads are served in arrival order and
+    never hold each other up beyond their own slot.
+    """
+
+    def __init__(self, rate, burst=1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """
+        Take one token, sleeping until it is available. Returns the time
+        spent waiting, in seconds.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            delay = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    def pause(self, seconds):
+        """
+        Hold every caller back for `seconds` (e.g. after a 429 with
+        Retry-After), on top of tokens already reserved.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+
+
+def set_rate_limit(requests_per_second, burst=None):
+    """
+    Limit all requests made through `get()` to `requests_per_second`
+    (shared across threads), with bursts of up to `burst` requests
+    (default: one second's worth). None or 0 disables the limit; an
+    existing RateLimiter instance is installed as-is.
+
+    Returns the previous limiter so callers can restore it.
+    """
+    global _rate_limiter
+    previous = _rate_limiter
+    if not requests_per_second or isinstance(requests_per_second, RateLimiter):
+        _rate_limiter = requests_per_second or None
+    else:
+        if burst is None:
+            burst = max(1, int(requests_per_second))
+        _rate_limiter = RateLimiter(requests_per_second, burst)
+    return previous
+
+
+def get_rate_limiter():
+    return _rate_limiter
+
+
+set_rate_limit(DEFAULT_RATE_LIMIT, burst=DEFAULT_BURST)
+
+
+# =========================
+# Requests
+# =========================
+
+def get(url, params=None, label=None, cache_ttl=NO_CACHE, conditional=False, **kwargs):
+    """
+    GET `url` through the shared session and record its timing.
+
+    Parameters
+    ----------
+    url : str
+        Full endpoint URL.
+    params : dict, optional
+        Query parameters, passed straight to requests.
+    label : str, optional
+        Short name used in the timing log (defaults to the URL path tail).
+    cache_ttl : float, None or False
+        False (default) bypasses the response cache. Otherwise successful
+        responses are cached for cache_ttl seconds (None = never expire),
+        typically from `bmrs_cache.ttl_for_date(date)`.
+    conditional : bool
+        Send the ETag / Last-Modified validators remembered from the last
+        response for this URL + params (If-None-Match / If-Modified-Since).
+        The server may then answer 304 Not Modified with an empty body.
+        Conditional requests always bypass the response cache.
+    """
+    label = label or url.rstrip("/").rsplit("/", 1)[-1]
+
+    if conditional:
+        cache_ttl = NO_CACHE
+        key = bmrs_cache.cache_key(url, params)
+        with _lock:
+            remembered = _validators.get(key, {})
+        if remembered:
+            headers = dict(kwargs.pop("headers", None) or {})
+            headers.update(remembered)
+            kwargs["headers"] = headers
+
+    cache = get_cache() if cache_ttl is not NO_CACHE else None
+    if cache is not None:
+        key = bmrs_cache.cache_key(url, params)
+        hit = cache.get(key)
+        if hit is not None:
+            r = bmrs_cache.response_from_cache(*hit)
+            _record(label, r, 0.0, new_connection=None, cache="hit")
+            return r
+
+    session = get_session()
+
+    limiter = _rate_limiter
+    wait_s = limiter.acquire() if limiter is not None else 0.0
+
+    kwargs.setdefault("timeout", _timeout)
+    conns_before = _connection_count(session, url)
+    t0 = time.perf_counter()
+    r = session.get(url, params=params, **kwargs)
+    total_s = time.perf_counter() - t0
+    conns_after = _connection_count(session, url)
+
+    if r.status_code == 429 and limiter is not None:
+        # Throttled: slow every thread down, not just this caller
+        limiter.pause(_retry_after_s(r, default=1.0))
+
+    if conns_before is None or conns_after is None:
+        new_connection = None
+    else:
+        new_connection = conns_after > conns_before
+
+    if conditional and r.status_code == 200:
+        validators = {}
+        if r.headers.get("ETag"):
+            validators["If-None-Match"] = r.headers["ETag"]
+        if r.headers.get("Last-Modified"):
+            validators["If-Modified-Since"] = r.headers["Last-Modified"]
+        with _lock:
+            _validators[key] = validators
+
+    if cache is not None and r.status_code == 200:
+        meta = {
+            "status": r.status_code,
+            "url": r.url,
+            "encoding": r.encoding,
+            "headers": {"Content-Type": r.headers.get("Content-Type", "application/json")},
+        }
+        cache.put(key, r.content, meta, ttl=cache_ttl)
+
+    _record(label, r, total_s, new_connection, cache="miss" if cache is not None else None, wait_s=wait_s)
+    return r
+
+
+def _retry_after_s(r, default=None):
+    # Retry-After in seconds (only the delta-seconds form is used by BMRS)
+    try:
+        return max(float(r.headers["Retry-After"]), 0.0)
+    except (KeyError, TypeError, ValueError):
+        return default
+
+
+# =========================
+# Retries
+# =========================
+
+class RequestFailed(Exception):
+    """
+    A BMRS request that did not succeed. `status` is the last HTTP status
+    (None if no response arrived) and `retryable` whether trying again
+    later might help.
+    """
+
+    def __init__(self, message, status=None, retryable=False):
+        super().__init__(message)
+        self.status = status
+        self.retryable = retryable
+
+
+class RetryPolicy:
+    """
+    Which failures to retry and how long to wait between attempts.
+
+    Retryable: timeouts, connection errors, 429 and the statuses in
+    `retry_statuses` (5xx gateway/server errors). Anything else, including
+    every other 4xx, is fatal and not retried.
+
+    The wait before attempt n+1 is drawn uniformly from
+    [0, min(backoff_max_s, backoff_initial_s * backoff_factor ** (n-1))]
+    ("full jitter", so concurrent callers do not retry in lockstep). A
+    Retry-After header overrides it, capped at backoff_max_s.
+    """
+
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+    RETRY_ERRORS = (rq.ConnectionError, rq.Timeout, rq.exceptions.ChunkedEncodingError)
+
+    def __init__(
+        self,
+        attempts=5,
+        backoff_initial_s=1.0,
+        backoff_factor=2.0,
+        backoff_max_s=30.0,
+        retry_statuses=RETRY_STATUSES,
+    ):
+        self.attempts = max(int(attempts), 1)
+        self.backoff_initial_s = float(backoff_initial_s)
+        self.backoff_factor = float(backoff_factor)
+        self.backoff_max_s = float(backoff_max_s)
+        self.retry_statuses = frozenset(retry_statuses)
+
+    def is_retryable(self, response=None, error=None):
+        if error is not None:
+            return isinstance(error, self.RETRY_ERRORS)
+        return response.status_code in self.retry_statuses
+
+    def delay_s(self, attempt, response=None):
+        """
+        Seconds to wait after failed attempt `attempt` (1-based).
+        """
+        if response is not None:
+            retry_after = _retry_after_s(response)
+            if retry_after is not None:
+                return min(retry_after, self.backoff_max_s)
+        cap = min(self.backoff_max_s, self.backoff_initial_s * self.backoff_factor ** (attempt - 1))
+        return random.uniform(0.0, cap)
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+
+def get_with_retry(url, ok_status=(200,), attempts=None, policy=None, **kwargs):
+    """
+    `get()` with retries. Returns the first response whose status is in
+    `ok_status`; raises RequestFailed on a fatal failure or once the
+    attempts are used up.
+
+    attempts overrides policy.attempts (e.g. a caller's query_attempt_count);
+    the remaining keyword arguments go to `get()`.
+    """
+    policy = policy or DEFAULT_RETRY_POLICY
+    attempts = policy.attempts if attempts is None else max(int(attempts), 1)
+    label = kwargs.get("label") or url.rstrip("/").rsplit("/", 1)[-1]
+
+    for attempt in range(1, attempts + 1):
+        response, error = None, None
+        try:
+            response = get(url, **kwargs)
+        except rq.RequestException as e:
+            error = e
+
+        if error is None and response.status_code in ok_status:
+            return response
+
+        status = None if response is None else response.status_code
+        problem = f"HTTP status {status}" if error is None else f"{type(error).__name__}: {error}"
+        retryable = policy.is_retryable(response, error)
+
+        if not retryable:
+            raise RequestFailed(f"API request ({label}) failed: {problem}", status=status, retryable=False)
+        if attempt == attempts:
+            raise RequestFailed(
+                f"API request ({label}) failed after {attempts} attempts: {problem}",
+                status=status,
+                retryable=True,
+            )
+
+        delay = policy.delay_s(attempt, response)
+        print(f"{label}: attempt {attempt} failed ({problem}); retrying in {delay:.1f}s")
+        time.sleep(delay)
+
+
+def _record(label, r, total_s, new_connection, cache=None, wait_s=0.0):
+    record = {
+        "label": label,
+        "url": r.url,
+        "status": r.status_code,
+        "started": time.time() - total_s,
+        "total_s": total_s,
+        "elapsed_s": r.elapsed.total_seconds(),
+        "bytes": 0 if cache == "hit" else len(r.content),
+        "encoding": r.headers.get("Content-Encoding", "identity"),
+        "new_connection": new_connection,
+        "cache": cache,
+        "rate_wait_s": wait_s,
+    }
+    with _lock:
+        _timings.append(record)
+
+
+def run_concurrently(calls, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+    """
+    Run independent fetch calls in parallel and return their results in order.
+
+    Parameters
+    ----------
+    calls : list of callables
+        Zero-argument callables, e.g. `lambda: fetch_wind_solar_actuals(d)`.
+    max_concurrency : int
+        Maximum number of calls in flight at once. 1 runs them sequentially
+        in the calling thread.
+
+    The first exception raised by any call is re-raised once all calls
+    have finished.
+    """
+    calls = list(calls)
+    if max_concurrency is None or max_concurrency < 1:
+        raise ValueError("max_concurrency must be a positive integer")
+
+    if max_concurrency == 1 or len(calls) <= 1:
+        return [call() for call in calls]
+
+    workers = min(max_concurrency, len(calls))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bmrs") as pool:
+        futures = [pool.submit(call) for call in calls]
+
+    # Executor shutdown waits for all futures, so result() never blocks here
+    return [f.result() for f in futures]
+
+
+# =========================
+# Timing inspection
+# =========================
+
+def timings():
+    """
+    Return a copy of the per-request timing log (list of dicts).
+    """
+    with _lock:
+        return list(_timings)
+
+
+def reset_timings():
+    with _lock:
+        _timings.clear()
+
+
+def timing_summary():
+    """
+    Aggregate the timing log.
+
+    The handshake saving is estimated as the difference between the mean
+    time of requests that opened a new connection and those that reused
+    one, multiplied by the number of reused requests.
+    """
+    log = timings()
+    new = [t["total_s"] for t in log if t["new_connection"]]
+    reused = [t["total_s"] for t in log if t["new_connection"] is False]
+
+    mean_new = sum(new) / len(new) if new else None
+    mean_reused = sum(reused) / len(reused) if reused else None
+
+    if mean_new is not None and mean_reused is not None:
+        est_saved = max(mean_new - mean_reused, 0.0) * len(reused)
+    else:
+        est_saved = None
+
+    return {
+        "requests": len(log),
+        "cache_hits": sum(1 for t in log if t.get("cache") == "hit"),
+        "new_connections": len(new),
+        "reused_connections": len(reused),
+        "total_s": sum(t["total_s"] for t in log),
+        "bytes": sum(t["bytes"] for t in log),
+        "mean_new_s": mean_new,
+        "mean_reused_s": mean_reused,
+        "est_handshake_saved_s": est_saved,
+        "rate_wait_s": sum(t.get("rate_wait_s", 0.0) for t in log),
+        "throttled": sum(1 for t in log if t["status"] == 429),
+    }
+
+
+def print_timing_summary():
+    s = timing_summary()
+
+    def fmt(v):
+        return "n/a" if v is None else f"{v:.3f}s"
+
+    print(
+        f" HTTP: {s['requests']} requests ({s['cache_hits']} from cache), "
+        f"{s['new_connections']} new / {s['reused_connections']} reused connections, "
+        f"{s['bytes'] / 1024:.1f} KiB, total {s['total_s']:.2f}s "
+        f"(mean new {fmt(s['mean_new_s'])}, mean reused {fmt(s['mean_reused_s'])}, "
+        f"est. handshake time saved {fmt(s['est_handshake_saved_s'])}), "
+        f"rate-limit wait {s['rate_wait_s']:.2f}s, {s['throttled']} throttled (429)"
+    )
+
+
+# =========================
+# CLI helpers
+# =========================
+
+def add_cli_arguments(parser):
+    """
+    Add the shared HTTP client options to an argparse parser.
+    """
+    parser.add_argument(
+        "--base-url",
+        default=_base_url,
+        help="BMRS API root; point at a local stand-in for offline runs "
+             f"(default: $BMRS_BASE_URL or {DEFAULT_BASE_URL}).",
+    )
+    parser.add_argument(
+        "--pool-size",
+        type=int,
+        default=DEFAULT_POOL_SIZE,
+        help="Keep-alive HTTP connections kept open to the BMRS API "
+             f"(default: {DEFAULT_POOL_SIZE}).",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=DEFAULT_MAX_CONCURRENCY,
+        help="Maximum BMRS requests in flight at once; 1 fetches sequentially "
+             f"(default: {DEFAULT_MAX_CONCURRENCY}).",
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="use_cache",
+        action="store_false",
+        help="Disable the on-disk response cache.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=bmrs_cache.DEFAULT_CACHE_DIR,
+        help=f"Response cache directory (default: {bmrs_cache.DEFAULT_CACHE_DIR}).",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=float,
+        default=bmrs_cache.DEFAULT_MAX_BYTES / (1024 * 1024),
+        help="Size budget of the response cache in MB; least recently used "
+             "entries are evicted beyond it (default: %(default).0f).",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=bmrs_cache.RECENT_TTL_S,
+        help="Cache TTL in seconds for dates that are not yet settled; settled "
+             f"dates never expire (default: {bmrs_cache.RECENT_TTL_S}).",
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=DEFAULT_RATE_LIMIT,
+        help="Maximum BMRS requests per second, shared by all threads; 0 disables "
+             f"(default: {DEFAULT_RATE_LIMIT:g}).",
+    )
+    parser.add_argument(
+        "--burst",
+        type=int,
+        default=DEFAULT_BURST,
+        help=f"Requests allowed back-to-back before --rate-limit applies (default: {DEFAULT_BURST}).",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT_S,
+        help="Seconds to wait for a BMRS response before the attempt is abandoned "
+             f"and retried (default: {DEFAULT_TIMEOUT_S:g}).",
+    )
+    parser.set_defaults(use_cache=True)
+    return parser
+
+
+def configure_from_args(args):
+    """
+    Apply the options added by `add_cli_arguments`.
+    """
+    set_base_url(args.base_url)
+    configure(pool_size=args.pool_size)
+    configure_cache(
+        enabled=args.use_cache,
+        cache_dir=args.cache_dir,
+        max_bytes=int(args.cache_max_mb * 1024 * 1024),
+        recent_ttl=args.cache_ttl,
+    )
+    set_rate_limit(args.rate_limit, burst=args.burst)
+    set_timeout(args.timeout)
@@ -0,0 +1,238 @@
+"""
+Figure export shared by task1.py and task2.py.
+
+Each figure is rendered once per output format: one PNG at the final
+size/scale and one HTML file.
+
+Kaleido (v1+) drives a headless Chrome to rasterise figures. Without a
+running sync server every `write_image` call launches and tears down its
+own browser, which dominates export time. `start_renderer()` starts one
+long-lived server that all later exports reuse (auto-update loops,
+repeated runs). Inside `batch()`, PNG exports are queued and rendered
+together with a single `plotly.io.write_images` call.
+
+Kaleido is optional: without it (or without Chrome) PNG export fails
+with the usual "FAILED TO SAVE PNG IMAGE" message and HTML still works.
+
+Headless mode (`--headless`) never opens interactive output: `show()`
+becomes a no-op and only the formats selected with `--outputs` are
+written (png, html, csv). `--headless --outputs` with no formats skips
+building figures altogether.
+"""
+import atexit
+import contextlib
+
+import plotly.io as pio
+
+import bmrs_profile
+
+try:
+    import kaleido
+except ImportError:  # optional: only needed for PNG export
+    kaleido = None
+
+
+DEFAULT_WIDTH = 1600
+DEFAULT_HEIGHT = 900
+DEFAULT_SCALE = 2
+
+FORMATS = ("png", "html", "csv")
+DEFAULT_FORMATS = ("png", "html")
+
+_headless = False
+_formats = DEFAULT_FORMATS
+_renderer_running = False
+_pending = None  # queued PNG exports while inside batch()
+
+
+# =========================
+# Configuration
+# =========================
+
+def configure(headless=None, formats=None):
+    """
+    Set headless mode and/or the artifact formats written by export_figure.
+    """
+    global _headless, _formats
+    if headless is not None:
+        _headless = bool(headless)
+    if formats is not None:
+        unknown = set(formats) - set(FORMATS)
+        if unknown:
+            raise ValueError(f"Unknown output format(s): {sorted(unknown)}")
+        _formats = tuple(formats)
+
+
+def is_headless():
+    return _headless
+
+
+def wants(fmt):
+    """
+    True if artifacts of format `fmt` ('png', 'html', 'csv') are requested.
+    """
+    return fmt in _formats
+
+
+def wants_figures():
+    """
+    False only when nothing would use a figure: headless with no outputs.
+    """
+    return bool(_formats) or not _headless
+
+
+def show(fig):
+    """
+    fig.show(), skipped in headless mode.
+    """
+    if not _headless:
+        fig.show()
+
+
+def add_cli_arguments(parser):
+    """
+    Add the shared output options (--headless, --outputs) to an argparse parser.
+    """
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="Never open interactive figures (no fig.show()); for unattended/service runs.",
+    )
+    parser.add_argument(
+        "--outputs",
+        nargs="*",
+        choices=FORMATS,
+        default=list(DEFAULT_FORMATS),
+        help="Artifacts to write per plot (default: png html). "
+             "'csv' saves the plotted data. Pass no values to write nothing.",
+    )
+
+
+def configure_from_args(args):
+    configure(headless=args.headless, formats=args.outputs)
+
+
+# =========================
+# Renderer lifecycle
+# =========================
+
+def _kaleido_v1():
+    return kaleido is not None and hasattr(kaleido, "start_sync_server")
+
+
+def _chrome_available():
+    # A sync server started without Chrome dies in its thread and the next
+    # export then blocks forever, so look for the browser up front.
+    try:
+        from choreographer.browsers.chromium import Chromium
+        return Chromium.find_browser(skip_local=False) is not None
+    except Exception:
+        return False
+
+
+def start_renderer():
+    """
+    Start a persistent Kaleido renderer reused by every later export.
+
+    Returns True when a renderer is running. Does nothing (returns False)
+    with kaleido < 1.0, without kaleido or when Chrome cannot be found;
+    exports then fall back to one-shot rendering.
+    """
+    global _renderer_running
+    if _renderer_running:
+        return True
+    if not _kaleido_v1() or not _chrome_available():
+        return False
+
+    kaleido.start_sync_server(silence_warnings=True)
+    _renderer_running = True
+    atexit.register(stop_renderer)
+    return True
+
+
+def stop_renderer():
+    """
+    Shut the persistent renderer down (registered atexit by start_renderer).
+    """
+    global _renderer_running
+    if not _renderer_running:
+        return
+    kaleido.stop_sync_server(silence_warnings=True)
+    _renderer_running = False
+
+
+# =========================
+# Export
+# =========================
+
+def _write_png(fig, path, width, height, scale):
+    try:
+        fig.write_image(path, width=width, height=height, scale=scale)
+        print(f"Saved PNG:  {path}")
+    except Exception as e:
+        print(f"FAILED TO SAVE PNG IMAGE ({path}): {e}")
+
+
+@bmrs_profile.stage("export_batch")
+def _flush(queued):
+    if len(queued) < 2 or not _kaleido_v1():
+        for job in queued:
+            _write_png(*job)
+        return
+
+    figs, paths, widths, heights, scales = (list(col) for col in zip(*queued))
+    try:
+        pio.write_images(figs, paths, width=widths, height=heights, scale=scales)
+    except Exception as e:
+        for path in paths:
+            print(f"FAILED TO SAVE PNG IMAGE ({path}): {e}")
+        return
+    for path in paths:
+        print(f"Saved PNG:  {path}")
+
+
+@bmrs_profile.stage("export")
+def export_figure(fig, base, width=DEFAULT_WIDTH, height=DEFAULT_HEIGHT, scale=DEFAULT_SCALE,
+                  data=None, formats=None):
+    """
+    Save `fig` in each requested format (default: the configured ones):
+    `<base>.png` (width x height layout px, times scale), `<base>.html`,
+    and `<base>.csv` with the plotted DataFrame `data`.
+
+    Inside `batch()` the PNG is queued and written when the block exits.
+    """
+    formats = _formats if formats is None else formats
+
+    if "png" in formats:
+        job = (fig, base + ".png", width, height, scale)
+        if _pending is not None:
+            _pending.append(job)
+        else:
+            _write_png(*job)
+
+    if "html" in formats:
+        fig.write_html(base + ".html", include_plotlyjs="cdn")
+        print(f"Saved HTML: {base}.html")
+
+    if "csv" in formats and data is not None:
+        data.to_csv(base + ".csv", index=False)
+        print(f"Saved CSV:  {base}.csv")
+
+
+@contextlib.contextmanager
+def batch():
+    """
+    Queue PNG exports made inside the block and render them in one
+    Kaleido call on exit. Nested blocks join the outermost batch.
+    """
+    global _pending
+    if _pending is not None:
+        yield
+        return
+
+    _pending = []
+    try:
+        yield
+    finally:
+        queued, _pending = _pending, None
+        _flush(queued)
@@ -0,0 +1,494 @@
+"""
+DataFrame helpers shared by task1.py and task2.py.
+
+Typed ingestion
+---------------
+`response_to_df(r, schema)` turns a BMRS JSON response straight into typed
+columns instead of `pd.DataFrame(r.json()["data"])`, which leaves dates and
+timestamps as Python strings in object columns:
+
+  - timestamps        -> datetime64[ns, UTC]
+  - settlementPeriod  -> int8
+  - settlementDate, psrType and other labels -> category
+  - MW values         -> float32
+
+orjson is used for decoding when installed (it is optional). With
+low_memory=True and ijson installed, records are streamed into columns one
+at a time, so the full list of decoded dicts never exists in memory.
+
+Local time
+----------
+Timestamp strings are parsed once per distinct value (a day has ~48 start
+times however many rows repeat them), and parsed strings are memoised
+across calls in a bounded LRU (`parse_utc_cached`), so polls that
+re-fetch the same day parse almost nothing. Typed ingestion goes through
+it, so `to_local(values)`, which converts UTC timestamps to Europe/Berlin,
+normally only re-labels datetime64 columns; string input takes the same
+memoised path.
+
+Local-day periods
+-----------------
+A Europe/Berlin day runs from SP 47 of the previous GB settlement day
+(SP 45 or 49 after a clock change). `local_periods` numbers each
+(settlementDate, settlementPeriod) by its position in that local day
+(`localPeriod`, int8) and by a day-spanning `periodKey` (int32). Sorting,
+joins and axis ordering use these integers rather than SP strings.
+"""
+import collections
+import datetime as dt
+import functools
+import io
+import json
+import threading
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:  # optional fast JSON decoder
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # optional streaming JSON decoder
+    ijson = None
+
+
+# =========================
+# Schemas
+# =========================
+
+DATETIME = "datetime"
+PERIOD = "period"
+CATEGORY = "category"
+MW = "mw"
+
+EVOLUTION_SCHEMA = {
+    "publishTime": DATETIME,
+    "startTime": DATETIME,
+    "settlementDate": CATEGORY,
+    "settlementPeriod": PERIOD,
+    "boundary": CATEGORY,
+    "indicatedGeneration": MW,
+    "indicatedDemand": MW,
+    "indicatedMargin": MW,
+    "indicatedImbalance": MW,
+}
+
+WIND_SOLAR_FORECAST_SCHEMA = {
+    "publishTime": DATETIME,
+    "startTime": DATETIME,
+    "processType": CATEGORY,
+    "businessType": CATEGORY,
+    "psrType": CATEGORY,
+    "settlementDate": CATEGORY,
+    "settlementPeriod": PERIOD,
+    "quantity": MW,
+}
+
+WIND_SOLAR_ACTUALS_SCHEMA = {
+    "publishTime": DATETIME,
+    "startTime": DATETIME,
+    "businessType": CATEGORY,
+    "psrType": CATEGORY,
+    "settlementDate": CATEGORY,
+    "settlementPeriod": PERIOD,
+    "quantity": MW,
+}
+
+
+# =========================
+# Typed ingestion
+# =========================
+
+def loads(body):
+    """
+    Decode a JSON body (bytes or str), with orjson when available.
+    """
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+BMRS_TIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def parse_utc(values):
+    """
+    Parse BMRS timestamp strings to datetime64[ns, UTC], using the API's
+    fixed format when it matches and general ISO-8601 parsing otherwise.
+    """
+    try:
+        return pd.to_datetime(values, utc=True, format=BMRS_TIME_FORMAT)
+    except (ValueError, TypeError):
+        return pd.to_datetime(values, utc=True, format="ISO8601")
+
+
+def _typed_column(values, kind):
+    if kind == DATETIME:
+        return parse_utc_cached(values)
+    if kind == PERIOD:
+        try:
+            return np.array(values, dtype=np.int8)
+        except (TypeError, ValueError):
+            # Missing periods: fall back to the nullable integer type
+            return pd.array(values, dtype="Int8")
+    if kind == CATEGORY:
+        return pd.Categorical(values)
+    if kind == MW:
+        return np.array(values, dtype=np.float32)
+    return values
+
+
+def _empty_df(schema):
+    return pd.DataFrame({
+        col: pd.Series(_typed_column([], kind)) for col, kind in schema.items()
+    })
+
+
+def _columns_to_df(columns, schema):
+    data = {}
+    for col in list(columns):
+        # pop as we go so each raw list is freed once its typed array exists
+        data[col] = _typed_column(columns.pop(col), schema.get(col))
+    return pd.DataFrame(data, copy=False)
+
+
+def records_to_df(records, schema):
+    """
+    Build a typed DataFrame from a list of BMRS JSON records.
+
+    Columns named in `schema` get its dtype; any other fields are kept as
+    they come. An empty payload still yields the schema's columns.
+    """
+    if not records:
+        return _empty_df(schema)
+
+    # Column order = first appearance across records, like pd.DataFrame(records)
+    names = dict.fromkeys(key for row in records for key in row)
+    columns = {col: [row.get(col) for row in records] for col in names}
+
+    return _columns_to_df(columns, schema)
+
+
+def _stream_columns(body):
+    # Single streaming pass: one decoded record alive at a time
+    columns = {}
+    n_rows = 0
+    for row in ijson.items(io.BytesIO(body), "data.item", use_float=True):
+        for key, value in row.items():
+            col = columns.get(key)
+            if col is None:
+                col = columns[key] = [None] * n_rows
+            col.append(value)
+        n_rows += 1
+        for col in columns.values():
+            if len(col) < n_rows:
+                col.append(None)
+    return columns
+
+
+def response_to_df(r, schema, low_memory=False):
+    """
+    Parse a BMRS response's `data` array into a typed DataFrame.
+
+    low_memory=True streams the payload with ijson (when installed),
+    trading some parse speed for a much lower peak memory on large bodies.
+    """
+    if low_memory and ijson is not None:
+        columns = _stream_columns(r.content)
+        if not columns:
+            return _empty_df(schema)
+        return _columns_to_df(columns, schema)
+
+    payload = loads(r.content)
+    return records_to_df(payload["data"], schema)
+
+
+def concat_typed(frames):
+    """
+    pd.concat that keeps categorical columns categorical when the inputs
+    have different categories (plain concat falls back to object).
+    """
+    frames = list(frames)
+    out = pd.concat(frames, ignore_index=True)
+    for col in out.columns:
+        if out[col].dtype == object and any(
+            isinstance(f[col].dtype, pd.CategoricalDtype) for f in frames if col in f.columns
+        ):
+            out[col] = out[col].astype("category")
+    return out
+
+
+# =========================
+# Local time
+# =========================
+
+LOCAL_TZ = "Europe/Berlin"
+TIME_CACHE_SIZE = 100_000   # distinct timestamp strings kept parsed
+
+_time_cache = collections.OrderedDict()   # string -> int64 ns since epoch (UTC)
+_time_cache_lock = threading.Lock()
+
+
+def _parse_distinct(strings):
+    # UTC epoch-ns for each distinct string; only cache misses are parsed
+    out = np.empty(len(strings), dtype=np.int64)
+    misses = []
+    with _time_cache_lock:
+        for i, text in enumerate(strings):
+            value = _time_cache.get(text)
+            if value is None:
+                misses.append(i)
+            else:
+                out[i] = value
+                _time_cache.move_to_end(text)
+
+    if misses:
+        parsed = parse_utc(pd.Index([strings[i] for i in misses], dtype=object)).asi8
+        out[misses] = parsed
+        with _time_cache_lock:
+            for i, value in zip(misses, parsed.tolist()):
+                _time_cache[strings[i]] = value
+            while len(_time_cache) > TIME_CACHE_SIZE:
+                _time_cache.popitem(last=False)
+    return out
+
+
+def parse_utc_cached(values):
+    """
+    parse_utc for timestamp strings that repeat across rows and calls
+    (a DatetimeIndex in UTC). Values are factorised, each distinct string
+    is parsed once via the memo, and the results are broadcast back to
+    the rows. Typed ingestion uses this for every timestamp column.
+    """
+    codes, uniques = pd.factorize(np.asarray(values, dtype=object), sort=False)
+    # Missing values have code -1, which picks the trailing NaT
+    nat = np.iinfo(np.int64).min
+    ns = np.append(_parse_distinct(list(uniques)), nat)[codes]
+    return pd.DatetimeIndex(ns.view("M8[ns]")).tz_localize("UTC")
+
+
+def to_local(values, tz=LOCAL_TZ):
+    """
+    UTC timestamps as tz-aware `tz` times (a Series aligned with `values`).
+
+    datetime64 input (what typed ingestion produces) is converted
+    directly; naive values are taken as UTC. Strings go through
+    parse_utc_cached first.
+    """
+    s = values if isinstance(values, pd.Series) else pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(s.dtype):
+        if s.dt.tz is None:
+            s = s.dt.tz_localize("UTC")
+        return s.dt.tz_convert(tz)
+
+    utc = pd.Series(parse_utc_cached(s.to_numpy(dtype=object)), index=s.index, name=s.name)
+    return utc.dt.tz_convert(tz)
+
+
+def clear_time_cache():
+    with _time_cache_lock:
+        _time_cache.clear()
+
+
+def with_columns(df, columns, owned=False):
+    """
+    `df` with `columns` (name -> values) added or replaced, as a new frame.
+
+    By default `df` is copied first, like df.assign(), so the result can be
+    modified freely. owned=True is for frames a pipeline built itself and
+    hands over: the result then shares the existing columns' data instead
+    of copying it, and the input must not be modified afterwards.
+    """
+    if not owned:
+        df = df.copy()
+    data = {col: columns[col] if col in columns else df[col] for col in df.columns}
+    data.update((col, values) for col, values in columns.items() if col not in data)
+    return pd.DataFrame(data, index=df.index, copy=False)
+
+
+# =========================
+# Local-day periods
+# =========================
+
+SETTLEMENT_TZ = "Europe/London"
+PERIOD_KEY_BASE = 64        # > 50, the periods in the longest local day
+_EPOCH = dt.date(1970, 1, 1)
+
+
+@functools.lru_cache(maxsize=4096)
+def periods_in_day(settlement_date):
+    """
+    Settlement periods in a GB settlement day: 48, or 46 / 50 on the
+    spring / autumn clock-change days.
+    """
+    day = pd.Timestamp(str(settlement_date))
+    start = day.tz_localize(SETTLEMENT_TZ)
+    end = (day + pd.Timedelta(days=1)).tz_localize(SETTLEMENT_TZ)
+    return int((end - start) // pd.Timedelta(minutes=30))
+
+
+def local_periods(settlement_dates, settlement_periods):
+    """
+    (period_key, position) int arrays for (settlementDate, settlementPeriod)
+    pairs.
+
+    `position` is the 1-based place of the period in its Europe/Berlin
+    local day. Berlin is always one hour ahead of GB, so the last two SPs
+    of settlement day D open local day D+1 (positions 1-2) and SP 1 of D is
+    position 3. This holds for 46- and 50-period days too.
+    `period_key` = local day number * PERIOD_KEY_BASE + position, which is
+    unique and chronological across days.
+    """
+    codes, uniques = pd.factorize(pd.Series(settlement_dates).astype(str), sort=False)
+    days = np.array([periods_in_day(d) for d in uniques], dtype=np.int64)
+    day_nums = np.array([(dt.date.fromisoformat(d) - _EPOCH).days for d in uniques], dtype=np.int64)
+
+    sp = np.asarray(settlement_periods, dtype=np.int64)
+    n = days[codes]
+    next_day = sp > n - 2
+    position = np.where(next_day, sp - (n - 2), sp + 2)
+    period_key = (day_nums[codes] + next_day) * PERIOD_KEY_BASE + position
+    return period_key.astype(np.int32), position.astype(np.int8)
+
+
+def local_period_columns(df):
+    """
+    {"localPeriod": int8, "periodKey": int32} columns for a frame with
+    settlementDate / settlementPeriod, for use with with_columns.
+    """
+    period_key, position = local_periods(df["settlementDate"], df["settlementPeriod"])
+    return {
+        "localPeriod": pd.Series(position, index=df.index),
+        "periodKey": pd.Series(period_key, index=df.index),
+    }
+
+
+class LocalDay:
+    """
+    One Europe/Berlin calendar day as the BMRS API sees it.
+
+      date        'YYYY-MM-DD'
+      start_utc   local midnight (aware UTC datetime)
+      end_utc     the next local midnight (exclusive)
+      n_periods   46, 48 or 50
+      periods     [(settlementDate, [SPs]), ...] in local-day order: the
+                  last two SPs of the previous settlement day, then SP
+                  1..n_periods-2 of the day itself
+
+    Endpoints filtered by startTime need one request for the whole window
+    (`time_params`); endpoints keyed by settlementDate need one request per
+    entry of `periods`.
+    """
+
+    def __init__(self, date):
+        day = dt.date.fromisoformat(str(date))
+        prev = (day - dt.timedelta(days=1)).isoformat()
+        prev_n = periods_in_day(prev)
+
+        self.date = day.isoformat()
+        self.n_periods = periods_in_day(self.date)
+        self.start_utc = pd.Timestamp(day).tz_localize(LOCAL_TZ).tz_convert("UTC").to_pydatetime()
+        self.end_utc = self.start_utc + dt.timedelta(minutes=30 * self.n_periods)
+        self.periods = [
+            (prev, [prev_n - 1, prev_n]),
+            (self.date, list(range(1, self.n_periods - 1))),
+        ]
+
+    def __repr__(self):
+        return f"LocalDay({self.date!r}, {self.n_periods} periods)"
+
+    @property
+    def last_period(self):
+        # (settlementDate, SP) of the local day's final period
+        settlement_date, sps = self.periods[-1]
+        return settlement_date, sps[-1]
+
+    def time_params(self):
+        """
+        'from' / 'to' startTime filters selecting exactly this day's
+        periods. 'to' is one minute before the next local midnight, so it
+        works whether the endpoint treats it as inclusive or exclusive.
+        """
+        fmt = "%Y-%m-%dT%H:%MZ"
+        return {
+            "from": self.start_utc.strftime(fmt),
+            "to": (self.end_utc - dt.timedelta(minutes=1)).strftime(fmt),
+        }
+
+
+def main_local_day(period_keys):
+    """
+    Local calendar day holding most of `period_keys` (None when empty).
+    """
+    days = np.asarray(period_keys, dtype=np.int64) // PERIOD_KEY_BASE
+    if len(days) == 0:
+        return None
+    values, counts = np.unique(days, return_counts=True)
+    return _EPOCH + dt.timedelta(days=int(values[counts.argmax()]))
+
+
+def local_day_labels(local_date=None):
+    """
+    Settlement period labels by local-day position for a Europe/Berlin day
+    ('YYYY-MM-DD' or date; None for a 48-period day): the last two SPs of
+    the previous settlement day, then SP 1.. of the day itself, e.g.
+    47, 48, 1..46.
+    """
+    if local_date is None:
+        return [str(sp) for sp in [47, 48] + list(range(1, 47))]
+    return [str(sp) for _, sps in LocalDay(local_date).periods for sp in sps]
+
+
+# =========================
+# Derived columns
+# =========================
+
+SIGN_DTYPE = pd.CategoricalDtype(["Positive", "Negative"])
+
+
+def sign_labels(values):
+    """
+    Vectorised "Positive" (>= 0) / "Negative" (< 0) labels as a categorical.
+    Missing values stay missing. A Series input keeps its index.
+    """
+    arr = np.asarray(values, dtype=np.float64)
+    codes = np.where(arr >= 0, 0, 1).astype(np.int8)
+    codes[np.isnan(arr)] = -1
+
+    labels = pd.Categorical.from_codes(codes, dtype=SIGN_DTYPE)
+    if isinstance(values, pd.Series):
+        return pd.Series(labels, index=values.index, name=values.name)
+    return labels
+
+
+# =========================
+# Diffs between snapshots
+# =========================
+
+def diff_frames(prev, new, key_cols, value_col):
+    """
+    Keys whose `value_col` differs between two snapshots (including keys
+    present in only one of them), as one row per key with
+    `<value_col>_prev`, `<value_col>_new` and `delta` (new - prev).
+    """
+    key_cols = list(key_cols)
+
+    def _keyed(df):
+        out = df[key_cols + [value_col]].copy()
+        for col in key_cols:
+            # categorical keys with different categories do not merge cleanly
+            if isinstance(out[col].dtype, pd.CategoricalDtype):
+                out[col] = out[col].astype(str)
+        return out
+
+    merged = _keyed(prev).merge(_keyed(new), on=key_cols, how="outer", suffixes=("_prev", "_new"))
+    before = merged[f"{value_col}_prev"]
+    after = merged[f"{value_col}_new"]
+
+    unchanged = (before == after) | (before.isna() & after.isna())
+    changed = merged[~unchanged].copy()
+    changed["delta"] = changed[f"{value_col}_new"] - changed[f"{value_col}_prev"]
+    return changed.sort_values(key_cols).reset_index(drop=True)
@@ -0,0 +1,150 @@
+"""
+Adaptive poll timing learned from observed publish cadence and lag.
+
+Two things decide when a new forecast revision can be fetched:
+
+  cadence  time between consecutive publishTimes (nominally 30 min)
+  lag      time from a revision's publishTime until the API serves it
+           (typically 1-3 min, but it varies)
+
+`PublishLagModel` learns both from what a watch observes. The cadence is
+the median gap between the distinct publishTimes seen. Each lag sample is
+the midpoint of the interval in which the revision must have appeared,
+from the last poll that did not see it to the poll that did.
+
+Polls for the next revision are placed at the learned lag quantiles after
+the expected publish time (`quantiles`, e.g. 0.5 and 0.9). Until
+`min_samples` lags have been observed, the fixed `fallback_offsets_s` are
+used instead. When every planned poll comes back empty, the gap between
+polls grows exponentially up to `backoff_max_s`.
+
+The trade-off between latency and request count is set by `quantiles`:
+lower or more quantiles pick revisions up sooner, at the cost of more
+empty polls.
+"""
+import collections
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_QUANTILES = (0.5, 0.9)
+DEFAULT_BACKOFF_INITIAL_S = 60.0
+DEFAULT_BACKOFF_FACTOR = 2.0
+DEFAULT_BACKOFF_MAX_S = 15 * 60.0
+MIN_SAMPLES = 5
+WINDOW = 200
+
+
+class PublishLagModel:
+    """
+    Rolling estimate of publish cadence and availability lag, plus the
+    poll schedule derived from them.
+    """
+
+    def __init__(
+        self,
+        default_interval_s=1800.0,
+        fallback_offsets_s=(0.0, 30.0, 90.0, 210.0),
+        quantiles=DEFAULT_QUANTILES,
+        backoff_initial_s=DEFAULT_BACKOFF_INITIAL_S,
+        backoff_factor=DEFAULT_BACKOFF_FACTOR,
+        backoff_max_s=DEFAULT_BACKOFF_MAX_S,
+        min_samples=MIN_SAMPLES,
+        learn=True,
+    ):
+        self.default_interval_s = float(default_interval_s)
+        self.fallback_offsets_s = tuple(float(x) for x in fallback_offsets_s) or (0.0,)
+        self.quantiles = tuple(sorted(quantiles))
+        self.backoff_initial_s = float(backoff_initial_s)
+        self.backoff_factor = float(backoff_factor)
+        self.backoff_max_s = float(backoff_max_s)
+        self.min_samples = min_samples
+        self.learn = learn
+
+        self._lags = collections.deque(maxlen=WINDOW)
+        self._publishes = set()
+
+    # ---------- learning ----------
+
+    def observe_publishes(self, publish_times):
+        """
+        Record publishTimes (aware timestamps) seen for this feed.
+        """
+        for t in publish_times:
+            if t is not None and not pd.isna(t):
+                self._publishes.add(t)
+        if len(self._publishes) > WINDOW:
+            self._publishes = set(sorted(self._publishes)[-WINDOW:])
+
+    def observe_arrival(self, publish_time, seen_at, last_poll_at=None):
+        """
+        Record that revision `publish_time` was first seen at `seen_at`.
+        `last_poll_at` is the previous poll that did not see it; without it
+        the arrival time is unbounded below and no lag is recorded.
+        """
+        self.observe_publishes([publish_time])
+        if last_poll_at is None:
+            return
+
+        upper = (seen_at - publish_time).total_seconds()
+        lower = max((last_poll_at - publish_time).total_seconds(), 0.0)
+        # A gap longer than two cadences means we were not really watching
+        if upper < 0 or upper > 2 * self.cadence_s():
+            return
+        self._lags.append((lower + upper) / 2)
+
+    # ---------- estimates ----------
+
+    def cadence_s(self):
+        """
+        Median gap between consecutive distinct publishTimes, in seconds.
+        """
+        if not self.learn or len(self._publishes) < 3:
+            return self.default_interval_s
+        times = sorted(self._publishes)
+        gaps = [(b - a).total_seconds() for a, b in zip(times, times[1:])]
+        gaps = [g for g in gaps if g > 0]
+        return float(np.median(gaps)) if gaps else self.default_interval_s
+
+    def offsets_s(self):
+        """
+        Planned poll offsets (seconds after the expected publish time).
+        """
+        if not self.learn or len(self._lags) < self.min_samples:
+            return self.fallback_offsets_s
+        offsets = np.quantile(np.fromiter(self._lags, dtype=float), self.quantiles)
+        return tuple(sorted(set(float(round(x, 1)) for x in offsets)))
+
+    def expected_publish(self, watermark):
+        return watermark + dt.timedelta(seconds=self.cadence_s())
+
+    def next_poll(self, expected_publish, attempt, now):
+        """
+        (when, attempt) for the `attempt`-th (0-based) poll of the current
+        wait for `expected_publish`.
+
+        Planned offsets already in the past are skipped (except the first
+        poll, which then runs at once). After the planned offsets, the gap
+        from `now` grows by backoff_factor per attempt, up to backoff_max_s.
+        """
+        offsets = self.offsets_s()
+        while attempt < len(offsets):
+            when = expected_publish + dt.timedelta(seconds=offsets[attempt])
+            if when > now or attempt == 0:
+                return max(when, now), attempt
+            attempt += 1
+
+        k = attempt - len(offsets)
+        delay = min(self.backoff_initial_s * self.backoff_factor ** k, self.backoff_max_s)
+        return now + dt.timedelta(seconds=delay), attempt
+
+    def summary(self):
+        lags = np.fromiter(self._lags, dtype=float)
+        if len(lags) == 0:
+            lag_str = "no lag samples yet"
+        else:
+            lag_str = f"lag median {np.median(lags):.0f}s, p90 {np.quantile(lags, 0.9):.0f}s (n={len(lags)})"
+        return f"cadence {self.cadence_s() / 60:.1f} min, {lag_str}"
+
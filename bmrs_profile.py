@@ -0,0 +1,425 @@
+"""
+Stage-level instrumentation for the task1.py / task2.py pipelines.
+
+Pipeline entry points are decorated with `run(...)` and their steps with
+`stage(...)` (fetch, decode, tz_convert, latest_per_sp, figure, export,
+...). With profiling off (the default) both are a single global check per
+call. With `--profile` each run records, per stage:
+
+  wall_s / cpu_s   wall-clock and process CPU time (CPU includes worker
+                   threads, e.g. concurrent fetches)
+  self_wall_s      wall time not spent in nested stages (e.g. figure build
+                   without the export it triggers)
+  rows_in/out      DataFrame rows passed in / returned (None otherwise)
+  peak_mb          peak memory allocated above the level at stage entry,
+                   from tracemalloc (`--profile-no-memory` skips it)
+
+At the end of a run a summary table is printed and one JSON line with the
+run totals and every stage is appended to `--profile-log`, so runs can be
+compared over time.
+
+tracemalloc slows allocation-heavy code, so wall times measured with
+memory tracing on are somewhat pessimistic. Peaks of stages that overlap
+in time (concurrent threads) are not separable and include each other.
+"""
+import datetime as dt
+import functools
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # not available on Windows; max RSS is then omitted
+    resource = None
+
+
+DEFAULT_LOG = os.path.join("bmrs_store", "profile.jsonl")
+
+_enabled = False
+_trace_memory = True
+_log_path = DEFAULT_LOG
+_verbose = True
+
+_lock = threading.Lock()
+_local = threading.local()   # per-thread stack of open stages
+_run = None                  # the active _Run, if any
+_open = set()                # open stages on all threads (for peak tracking)
+
+
+# =========================
+# Configuration
+# =========================
+
+def configure(enabled=None, log_path=None, trace_memory=None, verbose=None):
+    """
+    Turn instrumentation on/off and set the JSONL log (None keeps the
+    current value; an empty string disables the log).
+    """
+    global _enabled, _log_path, _trace_memory, _verbose
+    if enabled is not None:
+        _enabled = bool(enabled)
+    if log_path is not None:
+        _log_path = log_path
+    if trace_memory is not None:
+        _trace_memory = bool(trace_memory)
+    if verbose is not None:
+        _verbose = bool(verbose)
+
+
+def is_enabled():
+    return _enabled
+
+
+def add_cli_arguments(parser):
+    """
+    Add --profile, --profile-log and --profile-no-memory to an argparse parser.
+    """
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Record wall/CPU time, rows and peak memory per pipeline stage; "
+             "print a summary per run and append it to --profile-log.",
+    )
+    parser.add_argument(
+        "--profile-log",
+        default=DEFAULT_LOG,
+        help=f"JSON-lines file receiving one record per profiled run (default: {DEFAULT_LOG}).",
+    )
+    parser.add_argument(
+        "--profile-no-memory",
+        dest="profile_memory",
+        action="store_false",
+        help="Do not trace peak memory (lower overhead on wall times).",
+    )
+
+
+def configure_from_args(args):
+    configure(enabled=args.profile, log_path=args.profile_log, trace_memory=args.profile_memory)
+
+
+# =========================
+# Stages
+# =========================
+
+def _rows(obj):
+    # Rows in a DataFrame/Series, or summed over a tuple/list of them
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return len(obj)
+    if isinstance(obj, (tuple, list)):
+        counts = [_rows(x) for x in obj]
+        counts = [n for n in counts if n is not None]
+        return sum(counts) if counts else None
+    return None
+
+
+def _stack():
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def _fold_peak():
+    # Carry the tracemalloc peak into every open stage (and the run) before
+    # it is reset; call with _lock held
+    _, peak = tracemalloc.get_traced_memory()
+    for open_stage in _open:
+        open_stage._peak = max(open_stage._peak, peak)
+
+
+class stage:
+    """
+    Time one pipeline stage. Use as a decorator (rows in/out are taken from
+    DataFrame arguments and results) or as a context manager, setting
+    `rows_in` / `rows_out` on the yielded object by hand:
+
+        @bmrs_profile.stage("decode")
+        def req_to_df(*responses): ...
+
+        with bmrs_profile.stage("fetch") as st:
+            ...
+            st.rows_out = len(df)
+
+    Outside an active run nothing is recorded.
+    """
+
+    def __init__(self, name, rows_in=None):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+        self._active = False
+
+    def __call__(self, fn):
+        name = self.name
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _run is None:
+                return fn(*args, **kwargs)
+            with stage(name, rows_in=_rows(list(args) + list(kwargs.values()))) as st:
+                result = fn(*args, **kwargs)
+                st.rows_out = _rows(result)
+                return result
+
+        return wrapper
+
+    def __enter__(self):
+        run = _run
+        if run is None:
+            return self
+        self._active = True
+        self._run = run
+
+        stack = _stack()
+        self._parent = stack[-1] if stack else None
+        self._depth = len(stack)
+        self._child_wall = 0.0
+        self._peak = 0
+        stack.append(self)
+
+        if run.trace_memory:
+            with _lock:
+                _fold_peak()
+                self._mem_start = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+                _open.add(self)
+
+        self._cpu0 = time.process_time()
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self._active:
+            return False
+        wall = time.perf_counter() - self._t0
+        cpu = time.process_time() - self._cpu0
+
+        peak_mb = None
+        if self._run.trace_memory:
+            with _lock:
+                _fold_peak()
+                _open.discard(self)
+            peak_mb = max(self._peak - self._mem_start, 0) / 1e6
+
+        stack = _stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+        if self._parent is not None:
+            self._parent._child_wall += wall
+
+        self._run.add({
+            "stage": self.name,
+            "parent": self._parent.name if self._parent is not None else None,
+            "depth": self._depth,
+            "start_s": self._t0 - self._run.t0,
+            "wall_s": wall,
+            "self_wall_s": max(wall - self._child_wall, 0.0),
+            "cpu_s": cpu,
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "peak_mb": peak_mb,
+            "error": None if exc_type is None else exc_type.__name__,
+        })
+        self._active = False
+        return False
+
+
+# =========================
+# Runs
+# =========================
+
+def _max_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1e6 if sys.platform == "darwin" else rss / 1024
+
+
+def _scalar_params(fn, args, kwargs):
+    # JSON-friendly arguments of a pipeline call (dates, flags, sizes)
+    try:
+        bound = inspect.signature(fn).bind(*args, **kwargs)
+    except TypeError:
+        return {}
+    return {
+        k: v for k, v in bound.arguments.items()
+        if isinstance(v, (str, int, float, bool)) or v is None
+    }
+
+
+class _Run:
+
+    def __init__(self, name, params):
+        self.name = name
+        self.params = params
+        self.trace_memory = _trace_memory
+        self.stages = []
+        self._peak = 0
+        self.t0 = time.perf_counter()
+        self._stages_lock = threading.Lock()
+
+    def add(self, record):
+        with self._stages_lock:
+            self.stages.append(record)
+
+    def record(self):
+        return {
+            "run": self.name,
+            "started": self.started,
+            "params": self.params,
+            "wall_s": self.wall_s,
+            "cpu_s": self.cpu_s,
+            "peak_mb": self.peak_mb,
+            "max_rss_mb": _max_rss_mb(),
+            "error": self.error,
+            "stages": self.stages,
+        }
+
+
+class run:
+    """
+    Decorator marking a pipeline entry point (full_run_and_plot,
+    run_part2_wind_solar, ...). When profiling is on, each call collects
+    the stages it runs, prints a summary and appends one JSON line to the
+    log. Called inside another run, it is recorded as a stage of that run.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __call__(self, fn):
+        name = self.name
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            if _run is not None:
+                return stage(name)(fn)(*args, **kwargs)
+            return _profiled_call(name, fn, args, kwargs)
+
+        return wrapper
+
+
+def _profiled_call(name, fn, args, kwargs):
+    global _run
+    current = _Run(name, _scalar_params(fn, args, kwargs))
+
+    started_tracing = current.trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    with _lock:
+        if current.trace_memory:
+            mem_start = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            _open.add(current)
+        _run = current
+    current.started = dt.datetime.now(dt.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    cpu0 = time.process_time()
+    current.t0 = time.perf_counter()
+    current.error = None
+    try:
+        return fn(*args, **kwargs)
+    except Exception as e:
+        current.error = type(e).__name__
+        raise
+    finally:
+        current.wall_s = time.perf_counter() - current.t0
+        current.cpu_s = time.process_time() - cpu0
+        with _lock:
+            _run = None
+            current.peak_mb = None
+            if current.trace_memory:
+                _fold_peak()
+                _open.discard(current)
+                current.peak_mb = max(current._peak - mem_start, 0) / 1e6
+        if started_tracing:
+            tracemalloc.stop()
+        _finish(current)
+
+
+def _finish(current):
+    record = current.record()
+    if _verbose:
+        print_summary(record)
+    if _log_path:
+        directory = os.path.dirname(_log_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(_log_path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+# =========================
+# Reporting
+# =========================
+
+def summarise(record):
+    """
+    Stage table of a run record: one row per (parent, stage) in order of
+    first entry, with calls summed (a DataFrame).
+    """
+    stages = pd.DataFrame(record["stages"])
+    if stages.empty:
+        return stages
+    stages["parent"] = stages["parent"].fillna("")
+    stages["order"] = stages["start_s"]
+    return (
+        stages.groupby(["depth", "parent", "stage"], sort=False)
+        .agg(
+            calls=("stage", "size"),
+            wall_s=("wall_s", "sum"),
+            self_wall_s=("self_wall_s", "sum"),
+            cpu_s=("cpu_s", "sum"),
+            rows_in=("rows_in", "sum"),
+            rows_out=("rows_out", "sum"),
+            peak_mb=("peak_mb", "max"),
+            order=("order", "min"),
+        )
+        .reset_index()
+        .sort_values("order")
+        .drop(columns="order")
+        .reset_index(drop=True)
+    )
+
+
+def print_summary(record):
+    peak = "n/a" if record["peak_mb"] is None else f"{record['peak_mb']:.1f} MB"
+    params = ", ".join(f"{k}={v}" for k, v in record["params"].items() if k == "date")
+    rss = "" if record["max_rss_mb"] is None else f", max RSS {record['max_rss_mb']:.0f} MB"
+    print(
+        f" Profile {record['run']}" + (f" ({params})" if params else "") +
+        f": {record['wall_s']:.3f}s wall, {record['cpu_s']:.3f}s CPU, peak {peak}{rss}"
+    )
+
+    table = summarise(record)
+    if table.empty:
+        return
+    print(f"   {'stage':<28} {'calls':>5} {'wall (s)':>9} {'self (s)':>9} {'cpu (s)':>8} "
+          f"{'rows in':>9} {'rows out':>9} {'peak (MB)':>9}")
+    for row in table.itertuples(index=False):
+        name = "  " * row.depth + row.stage
+        rows_in = "" if pd.isna(row.rows_in) or row.rows_in == 0 else f"{int(row.rows_in)}"
+        rows_out = "" if pd.isna(row.rows_out) or row.rows_out == 0 else f"{int(row.rows_out)}"
+        peak_mb = "" if pd.isna(row.peak_mb) else f"{row.peak_mb:.1f}"
+        print(f"   {name:<28} {row.calls:>5} {row.wall_s:>9.3f} {row.self_wall_s:>9.3f} {row.cpu_s:>8.3f} "
+              f"{rows_in:>9} {rows_out:>9} {peak_mb:>9}")
+
+
+def read_log(path=None):
+    """
+    Run records from a JSONL profile log (oldest first).
+    """
+    path = path or _log_path
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
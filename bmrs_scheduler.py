@@ -0,0 +1,152 @@
+"""
+Timer-heap scheduler for the polling loops.
+
+Jobs are (due time, callable) pairs kept in a heap. `Scheduler.run()`
+sleeps on a condition variable until the earliest job is due, runs it, and
+repeats; adding or cancelling a job wakes it early. There is no periodic
+tick, so an idle process uses no CPU however many watches are pending.
+
+Jobs run one at a time on the thread that called `run()`. A job that wants
+to run again schedules itself (e.g. the next poll of a watch). Progress is
+one line per upcoming job rather than a per-second countdown.
+
+`run()` returns when no jobs are left or after `shutdown()`, which is also
+triggered by Ctrl+C and SIGTERM.
+"""
+import datetime as dt
+import heapq
+import itertools
+import signal
+import threading
+import time
+
+
+class Job:
+    """
+    Handle for a scheduled call; `cancel()` stops it from running.
+    """
+
+    __slots__ = ("when", "name", "fn", "args", "cancelled")
+
+    def __init__(self, when, name, fn, args):
+        self.when = when
+        self.name = name
+        self.fn = fn
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def __repr__(self):
+        return f"Job({self.name!r}, due {_fmt_time(self.when)})"
+
+
+def _fmt_time(epoch_s):
+    return dt.datetime.fromtimestamp(epoch_s).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _fmt_delay(seconds):
+    mins, secs = divmod(int(round(seconds)), 60)
+    hours, mins = divmod(mins, 60)
+    return f"{hours:02d}:{mins:02d}:{secs:02d}"
+
+
+class Scheduler:
+    """
+    Single-threaded timer heap. call_at / call_later / cancel / shutdown
+    may be called from any thread (or from inside a running job).
+    """
+
+    def __init__(self, verbose=True):
+        self.verbose = verbose
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._stopping = False
+
+    def call_at(self, when, fn, *args, name=None):
+        """
+        Run fn(*args) at `when` (aware datetime or epoch seconds). A time
+        in the past runs as soon as possible. Returns the Job.
+        """
+        if isinstance(when, dt.datetime):
+            when = when.timestamp()
+        job = Job(float(when), name or getattr(fn, "__name__", "job"), fn, args)
+        with self._cond:
+            heapq.heappush(self._heap, (job.when, next(self._seq), job))
+            self._cond.notify()
+        return job
+
+    def call_later(self, delay_s, fn, *args, name=None):
+        return self.call_at(time.time() + max(delay_s, 0.0), fn, *args, name=name)
+
+    def cancel(self, job):
+        with self._cond:
+            job.cancel()
+            self._cond.notify()
+
+    def pending(self):
+        """
+        Live jobs, earliest first.
+        """
+        with self._cond:
+            return [job for _, _, job in sorted(self._heap) if not job.cancelled]
+
+    def shutdown(self):
+        """
+        Stop run() after the job in progress (if any); pending jobs are dropped.
+        """
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+
+    def _next_job(self):
+        # Blocks until a job is due; None means stop
+        announced = None
+        with self._cond:
+            while True:
+                if self._stopping:
+                    return None
+                while self._heap and self._heap[0][2].cancelled:
+                    heapq.heappop(self._heap)
+                if not self._heap:
+                    return None
+
+                when, _, job = self._heap[0]
+                delay = when - time.time()
+                if delay <= 0:
+                    heapq.heappop(self._heap)
+                    return job
+
+                if self.verbose and job is not announced:
+                    print(f" Next: {job.name} at {_fmt_time(when)} (in {_fmt_delay(delay)})", flush=True)
+                    announced = job
+                self._cond.wait(delay)
+
+    def run(self):
+        """
+        Run jobs as they fall due until none are left or shutdown() is called.
+        A job that raises is reported and dropped; the others keep running.
+        """
+        previous_sigterm = None
+        if threading.current_thread() is threading.main_thread():
+            previous_sigterm = signal.signal(signal.SIGTERM, lambda *_: self.shutdown())
+
+        try:
+            while True:
+                job = self._next_job()
+                if job is None:
+                    break
+                try:
+                    job.fn(*job.args)
+                except Exception as e:
+                    print(f" Scheduled job '{job.name}' failed: {e}")
+        except KeyboardInterrupt:
+            print("\n Interrupted, shutting down.")
+        finally:
+            with self._cond:
+                self._heap.clear()
+                self._stopping = False
+            if previous_sigterm is not None:
+                signal.signal(signal.SIGTERM, previous_sigterm)
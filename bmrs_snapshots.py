@@ -0,0 +1,144 @@
+"""
+Append-only store of every indicated-imbalance forecast revision seen.
+
+The evolution endpoint returns every revision for the requested periods,
+but auto_update_loop only keeps the latest snapshot in memory. The store
+keeps all of them in a local SQLite file:
+
+  evolution(settlement_date, settlement_period, publish_time,
+            start_time, indicated_imbalance)
+
+The primary key (settlement_date, settlement_period, publish_time) both
+deduplicates on write (a revision is immutable, so re-seen rows are
+ignored) and serves as the date/SP index for queries. Timestamps are UTC
+ISO-8601 strings ('YYYY-MM-DDTHH:MM:SSZ'), which sort chronologically.
+
+The file can be queried directly with sqlite3 or via `history()`.
+"""
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+import bmrs_frames
+
+
+DEFAULT_PATH = os.path.join("bmrs_store", "evolution_snapshots.sqlite")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS evolution (
+    settlement_date     TEXT    NOT NULL,
+    settlement_period   INTEGER NOT NULL,
+    publish_time        TEXT    NOT NULL,
+    start_time          TEXT,
+    indicated_imbalance REAL    NOT NULL,
+    PRIMARY KEY (settlement_date, settlement_period, publish_time)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS evolution_publish_time ON evolution (publish_time);
+"""
+
+_COLUMNS = ["settlementDate", "settlementPeriod", "publishTime", "startTime", "indicatedImbalance"]
+
+
+def _utc_strings(values):
+    return pd.to_datetime(values, utc=True).dt.strftime(bmrs_frames.BMRS_TIME_FORMAT)
+
+
+class SnapshotStore:
+    """
+    SQLite-backed revision history. Use from a single thread.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def append(self, df):
+        """
+        Record the revisions in an evolution DataFrame (raw or processed;
+        needs settlementDate, settlementPeriod, publishTime, startTime and
+        indicatedImbalance). Rows without an imbalance are skipped and rows
+        already stored are ignored.
+
+        Returns the number of new revisions written.
+        """
+        df = df[df["indicatedImbalance"].notna()]
+        if df.empty:
+            return 0
+
+        rows = zip(
+            df["settlementDate"].astype(str),
+            df["settlementPeriod"].astype(int).tolist(),
+            _utc_strings(df["publishTime"]),
+            _utc_strings(df["startTime"]),
+            df["indicatedImbalance"].astype(float).tolist(),
+        )
+
+        before = self._conn.total_changes
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO evolution VALUES (?, ?, ?, ?, ?)", rows
+            )
+        return self._conn.total_changes - before
+
+    def history(self, settlement_date=None, settlement_periods=None, published_from=None, published_to=None):
+        """
+        Stored revisions as a typed DataFrame (same dtypes as req_to_df),
+        ordered by date, SP and publish time.
+
+        All filters are optional: one settlement date ('YYYY-MM-DD'), a list
+        of settlement periods, and a publishTime range [from, to) given as
+        anything pd.Timestamp accepts (naive values are taken as UTC).
+        """
+        where, params = [], []
+        if settlement_date is not None:
+            where.append("settlement_date = ?")
+            params.append(str(settlement_date))
+        if settlement_periods is not None:
+            periods = [int(p) for p in settlement_periods]
+            where.append(f"settlement_period IN ({', '.join('?' * len(periods))})")
+            params.extend(periods)
+        if published_from is not None:
+            where.append("publish_time >= ?")
+            params.append(_utc_strings(pd.Series([published_from])).iloc[0])
+        if published_to is not None:
+            where.append("publish_time < ?")
+            params.append(_utc_strings(pd.Series([published_to])).iloc[0])
+
+        query = "SELECT * FROM evolution"
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " ORDER BY settlement_date, settlement_period, publish_time"
+
+        rows = self._conn.execute(query, params).fetchall()
+        if not rows:
+            return bmrs_frames.records_to_df([], {c: bmrs_frames.EVOLUTION_SCHEMA[c] for c in _COLUMNS})
+
+        dates, periods, published, starts, imbalance = zip(*rows)
+        return pd.DataFrame({
+            "settlementDate": pd.Categorical(dates),
+            "settlementPeriod": np.array(periods, dtype=np.int8),
+            "publishTime": bmrs_frames.parse_utc(list(published)),
+            "startTime": bmrs_frames.parse_utc(list(starts)),
+            "indicatedImbalance": np.array(imbalance, dtype=np.float32),
+        })
+
+    def latest_publish_time(self):
+        """
+        Latest publishTime stored (UTC pd.Timestamp), or None when empty.
+        """
+        (latest,) = self._conn.execute("SELECT MAX(publish_time) FROM evolution").fetchone()
+        return None if latest is None else pd.Timestamp(latest)
+
+    def __len__(self):
+        (n,) = self._conn.execute("SELECT COUNT(*) FROM evolution").fetchone()
+        return n
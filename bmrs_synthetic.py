@@ -0,0 +1,282 @@
+"""
+Synthetic BMRS payloads for offline testing and benchmarking.
+
+Produces rows shaped like the three endpoints used by task1.py / task2.py:
+
+  - /forecast/indicated/day-ahead/evolution           -> evolution_rows()
+  - /forecast/generation/wind-and-solar/day-ahead     -> wind_solar_forecast_rows()
+  - /generation/actual/per-type/wind-and-solar        -> wind_solar_actual_rows()
+
+Values are deterministic for a given (date, settlement period, seed), so
+repeated runs are comparable. Settlement periods are derived from UK local
+time, so clock-change days have 46 / 50 periods like the real API.
+
+The *_payload() helpers build complete JSON bodies spanning several days
+(up to a year or more) for benchmarks. Pure standard library, so the
+stand-in server has no heavy imports.
+"""
+import datetime as dt
+import json
+import math
+import random
+from zoneinfo import ZoneInfo
+
+
+UK_TZ = ZoneInfo("Europe/London")
+UTC = dt.timezone.utc
+HALF_HOUR = dt.timedelta(minutes=30)
+
+DEFAULT_PSR_TYPES = ("Solar", "Wind Offshore", "Wind Onshore")
+
+# psrType sets for benchmarks; "mixed" adds types task2 has to filter out
+PSR_MIXES = {
+    "standard": DEFAULT_PSR_TYPES,
+    "wind": ("Wind Offshore", "Wind Onshore"),
+    "solar": ("Solar",),
+    "mixed": DEFAULT_PSR_TYPES + ("Hydro Run-of-river and poundage", "Biomass"),
+}
+
+
+# =========================
+# Settlement calendar
+# =========================
+
+def _parse_date(date):
+    if isinstance(date, dt.date):
+        return date
+    return dt.datetime.strptime(date, "%Y-%m-%d").date()
+
+
+def settlement_day_start(date):
+    """
+    UTC start of settlement date `date` (UK local midnight).
+    """
+    d = _parse_date(date)
+    return dt.datetime(d.year, d.month, d.day, tzinfo=UK_TZ).astimezone(UTC)
+
+
+def periods_in_day(date):
+    """
+    Number of settlement periods on `date`: 48, or 46 / 50 on clock changes.
+    """
+    d = _parse_date(date)
+    start = settlement_day_start(d)
+    end = settlement_day_start(d + dt.timedelta(days=1))
+    return int((end - start) / HALF_HOUR)
+
+
+def period_start(date, settlement_period):
+    """
+    UTC start time of `settlement_period` (1-based) on settlement date `date`.
+    """
+    return settlement_day_start(date) + (settlement_period - 1) * HALF_HOUR
+
+
+def settlement_period_for(start_utc):
+    """
+    (settlementDate 'YYYY-MM-DD', settlementPeriod) containing UTC time `start_utc`.
+    """
+    local_date = start_utc.astimezone(UK_TZ).date()
+    sp = int((start_utc - settlement_day_start(local_date)) / HALF_HOUR) + 1
+    return local_date.isoformat(), sp
+
+
+def iso_z(ts):
+    return ts.astimezone(UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _rng(seed, *key):
+    return random.Random(f"{seed}|" + "|".join(map(str, key)))
+
+
+# =========================
+# Indicated imbalance evolution
+# =========================
+
+def evolution_rows(settlement_date, settlement_periods=None, revisions=48, seed=0,
+                   published_before=None, padding=0):
+    """
+    Indicated day-ahead imbalance evolution rows.
+
+    Each settlement period gets `revisions` forecasts, published every
+    half hour and ending one period before its start time. Rows published
+    after `published_before` (UTC datetime) are omitted, which mimics a
+    live day that is still being revised. `padding` adds a filler field of
+    that many characters per row to inflate payload size.
+    """
+    n_periods = periods_in_day(settlement_date)
+    if settlement_periods is None:
+        settlement_periods = range(1, n_periods + 1)
+
+    date_str = _parse_date(settlement_date).isoformat()
+    rows = []
+
+    for sp in settlement_periods:
+        sp = int(sp)
+        if not 1 <= sp <= n_periods:
+            continue
+
+        start = period_start(settlement_date, sp)
+        rng = _rng(seed, "evo", date_str, sp)
+
+        # Diurnal demand shape plus a slow random walk across revisions
+        demand = 28000 + 8000 * math.sin((sp - 14) / 48 * 2 * math.pi)
+        generation = demand + rng.gauss(0, 400)
+        imbalance = rng.gauss(0, 300)
+
+        for k in range(revisions, 0, -1):
+            publish = start - k * HALF_HOUR
+            generation += rng.gauss(0, 60)
+            imbalance += rng.gauss(0, 40)
+            if published_before is not None and publish > published_before:
+                break
+
+            row = {
+                "publishTime": iso_z(publish),
+                "startTime": iso_z(start),
+                "settlementDate": date_str,
+                "settlementPeriod": sp,
+                "boundary": "N",
+                "indicatedGeneration": round(generation),
+                "indicatedDemand": round(generation - imbalance),
+                "indicatedMargin": round(rng.uniform(2000, 9000)),
+                "indicatedImbalance": round(imbalance),
+            }
+            if padding:
+                row["padding"] = "x" * padding
+            rows.append(row)
+
+    return rows
+
+
+# =========================
+# Wind & solar
+# =========================
+
+def _half_hours(start_utc, end_utc, inclusive_end):
+    t = start_utc
+    while t < end_utc or (inclusive_end and t == end_utc):
+        yield t
+        t += HALF_HOUR
+
+
+def _wind_solar_mw(psr_type, start_utc, seed, kind):
+    date_str, sp = settlement_period_for(start_utc)
+    rng = _rng(seed, kind, psr_type, date_str, sp)
+    base = _rng(seed, "base", psr_type, date_str, sp)
+
+    if "solar" in psr_type.lower():
+        hour = start_utc.astimezone(UK_TZ).hour + start_utc.minute / 60
+        mw = max(0.0, 9000 * math.sin((hour - 6) / 12 * math.pi)) if 6 <= hour <= 18 else 0.0
+    elif "offshore" in psr_type.lower():
+        mw = 7000 + 3000 * math.sin(sp / 10) + base.gauss(0, 300)
+    else:
+        mw = 3500 + 1500 * math.sin(sp / 12) + base.gauss(0, 200)
+
+    # Forecast and actual differ by a fuel-dependent error
+    if kind == "actual":
+        mw *= 1 + rng.gauss(0, 0.08)
+
+    return round(max(mw, 0.0), 3)
+
+
+def wind_solar_forecast_rows(from_utc, to_utc, psr_types=DEFAULT_PSR_TYPES, seed=0, padding=0):
+    """
+    Day-ahead wind/solar forecast rows with startTime in [from_utc, to_utc].
+    """
+    rows = []
+    for start in _half_hours(from_utc, to_utc, inclusive_end=True):
+        date_str, sp = settlement_period_for(start)
+        publish = dt.datetime.combine(
+            _parse_date(date_str) - dt.timedelta(days=1), dt.time(17, 30), tzinfo=UTC
+        )
+        for psr in psr_types:
+            row = {
+                "publishTime": iso_z(publish),
+                "processType": "Day ahead",
+                "businessType": "Solar generation" if "solar" in psr.lower() else "Wind generation",
+                "psrType": psr,
+                "startTime": iso_z(start),
+                "settlementDate": date_str,
+                "settlementPeriod": sp,
+                "quantity": _wind_solar_mw(psr, start, seed, "forecast"),
+            }
+            if padding:
+                row["padding"] = "x" * padding
+            rows.append(row)
+    return rows
+
+
+def wind_solar_actual_rows(from_utc, to_utc, psr_types=DEFAULT_PSR_TYPES, seed=0, padding=0):
+    """
+    Actual/estimated wind/solar generation rows with startTime in [from_utc, to_utc).
+    """
+    rows = []
+    for start in _half_hours(from_utc, to_utc, inclusive_end=False):
+        date_str, sp = settlement_period_for(start)
+        for psr in psr_types:
+            row = {
+                "publishTime": iso_z(start + 2 * HALF_HOUR),
+                "businessType": "Solar generation" if "solar" in psr.lower() else "Wind generation",
+                "psrType": psr,
+                "quantity": _wind_solar_mw(psr, start, seed, "actual"),
+                "startTime": iso_z(start),
+                "settlementDate": date_str,
+                "settlementPeriod": sp,
+            }
+            if padding:
+                row["padding"] = "x" * padding
+            rows.append(row)
+    return rows
+
+
+# =========================
+# Multi-day payloads
+# =========================
+
+def settlement_dates(start, days):
+    """
+    `days` consecutive settlement dates from `start` (date or 'YYYY-MM-DD').
+    """
+    start = _parse_date(start)
+    return [start + dt.timedelta(days=i) for i in range(days)]
+
+
+def to_payload(rows):
+    """
+    JSON body as served by the API: {"data": [...]}, UTF-8 encoded.
+    """
+    return json.dumps({"data": rows}).encode("utf-8")
+
+
+def evolution_payload(start, days=1, revisions=48, seed=0, published_before=None):
+    """
+    Evolution body for every SP of `days` settlement dates from `start`,
+    with `revisions` forecasts per SP.
+    """
+    rows = []
+    for d in settlement_dates(start, days):
+        rows.extend(evolution_rows(d, revisions=revisions, seed=seed, published_before=published_before))
+    return to_payload(rows)
+
+
+def _utc_range(start, days):
+    first = settlement_day_start(_parse_date(start))
+    end = settlement_day_start(_parse_date(start) + dt.timedelta(days=days))
+    return first, end
+
+
+def wind_solar_forecast_payload(start, days=1, psr_types=DEFAULT_PSR_TYPES, seed=0):
+    """
+    Wind/solar forecast body covering `days` settlement dates from `start`.
+    """
+    first, end = _utc_range(start, days)
+    return to_payload(wind_solar_forecast_rows(first, end - HALF_HOUR, psr_types=psr_types, seed=seed))
+
+
+def wind_solar_actual_payload(start, days=1, psr_types=DEFAULT_PSR_TYPES, seed=0):
+    """
+    Wind/solar actuals body covering `days` settlement dates from `start`.
+    """
+    first, end = _utc_range(start, days)
+    return to_payload(wind_solar_actual_rows(first, end, psr_types=psr_types, seed=seed))
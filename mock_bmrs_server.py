@@ -0,0 +1,257 @@
+"""
+Local stand-in for the BMRS Insights API.
+
+Serves the three endpoints used by task1.py / task2.py with synthetic
+payloads from bmrs_synthetic.py, so the fetch pipeline can be run,
+benchmarked and load-tested without network access:
+
+  GET <prefix>/forecast/indicated/day-ahead/evolution
+  GET <prefix>/forecast/generation/wind-and-solar/day-ahead
+  GET <prefix>/generation/actual/per-type/wind-and-solar
+
+<prefix> defaults to /bmrs/api/v1. Point the scripts at it with
+`--base-url http://127.0.0.1:8080/bmrs/api/v1` (or BMRS_BASE_URL).
+
+Latency, error rate and payload size are configurable. Responses support
+keep-alive, gzip and ETag / If-None-Match, like the real service.
+
+Usage:
+    python mock_bmrs_server.py --port 8080 --latency-ms 80 --error-rate 0.05
+"""
+import argparse
+import datetime as dt
+import gzip
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import bmrs_synthetic as synth
+
+
+API_PREFIX = "/bmrs/api/v1"
+
+EVOLUTION_PATH = "/forecast/indicated/day-ahead/evolution"
+FORECAST_PATH = "/forecast/generation/wind-and-solar/day-ahead"
+ACTUALS_PATH = "/generation/actual/per-type/wind-and-solar"
+
+
+def _parse_time(value):
+    # Accepts 'YYYY-MM-DD', 'YYYY-MM-DDTHH:MMZ' and full ISO-8601
+    if len(value) == 10:
+        return dt.datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=dt.timezone.utc)
+    return dt.datetime.fromisoformat(value.replace("Z", "+00:00")).astimezone(dt.timezone.utc)
+
+
+class MockConfig:
+    """
+    Behaviour knobs shared by all handler threads.
+    """
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, throttle_rate=0.0,
+                 revisions=48, psr_types=synth.DEFAULT_PSR_TYPES, padding=0, seed=0, live=True):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.revisions = revisions
+        self.psr_types = tuple(psr_types)
+        self.padding = padding
+        self.seed = seed
+        self.live = live
+        self.request_count = 0
+        self.lock = threading.Lock()
+
+
+class MockBMRSHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    config = MockConfig()
+
+    def log_message(self, *args):
+        pass
+
+    # ---------- helpers ----------
+
+    def _send(self, status, body=b"", headers=None):
+        headers = dict(headers or {})
+        if body and "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body, compresslevel=5)
+            headers["Content-Encoding"] = "gzip"
+        self.send_response(status)
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def _send_json(self, rows):
+        body = json.dumps({"data": rows}, separators=(",", ":")).encode("utf-8")
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self._send(304, headers={"ETag": etag})
+            return
+        self._send(200, body, {"Content-Type": "application/json", "ETag": etag})
+
+    def _error(self, status, message):
+        body = json.dumps({"status": status, "error": message}).encode("utf-8")
+        self._send(status, body, {"Content-Type": "application/json"})
+
+    # ---------- endpoints ----------
+
+    def do_GET(self):
+        cfg = self.config
+        with cfg.lock:
+            cfg.request_count += 1
+
+        delay = cfg.latency_ms + random.uniform(0, cfg.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+        roll = random.random()
+        if roll < cfg.throttle_rate:
+            self._send(429, headers={"Retry-After": "1"})
+            return
+        if roll < cfg.throttle_rate + cfg.error_rate:
+            self._error(503, "Synthetic failure")
+            return
+
+        url = urlparse(self.path)
+        path = url.path
+        if path.startswith(API_PREFIX):
+            path = path[len(API_PREFIX):]
+        query = parse_qs(url.query)
+
+        try:
+            if path == EVOLUTION_PATH:
+                rows = self._evolution(query)
+            elif path == FORECAST_PATH:
+                rows = self._forecast(query)
+            elif path == ACTUALS_PATH:
+                rows = self._actuals(query)
+            else:
+                self._error(404, f"Unknown endpoint {path}")
+                return
+        except (KeyError, ValueError) as e:
+            self._error(400, f"Bad request: {e}")
+            return
+
+        self._send_json(rows)
+
+    def _evolution(self, query):
+        cfg = self.config
+        date = query["settlementDate"][0]
+        periods = [int(p) for p in query.get("settlementPeriod", [])] or None
+        return synth.evolution_rows(
+            date,
+            periods,
+            revisions=cfg.revisions,
+            seed=cfg.seed,
+            published_before=dt.datetime.now(dt.timezone.utc) if cfg.live else None,
+            padding=cfg.padding,
+        )
+
+    def _forecast(self, query):
+        cfg = self.config
+        return synth.wind_solar_forecast_rows(
+            _parse_time(query["from"][0]),
+            _parse_time(query["to"][0]),
+            psr_types=cfg.psr_types,
+            seed=cfg.seed,
+            padding=cfg.padding,
+        )
+
+    def _actuals(self, query):
+        cfg = self.config
+        start = _parse_time(query["from"][0])
+        end = _parse_time(query["to"][0])
+
+        if "settlementPeriodFrom" in query:
+            # from/to are settlement dates; keep [from, to) and the SP range
+            sp_from = int(query["settlementPeriodFrom"][0])
+            sp_to = int(query.get("settlementPeriodTo", [50])[0])
+            start_date = start.date()
+            end_date = end.date() if end.date() > start_date else start_date + dt.timedelta(days=1)
+            rows = synth.wind_solar_actual_rows(
+                synth.settlement_day_start(start_date),
+                synth.settlement_day_start(end_date),
+                psr_types=cfg.psr_types,
+                seed=cfg.seed,
+                padding=cfg.padding,
+            )
+            return [r for r in rows if sp_from <= r["settlementPeriod"] <= sp_to]
+
+        return synth.wind_solar_actual_rows(start, end, psr_types=cfg.psr_types,
+                                            seed=cfg.seed, padding=cfg.padding)
+
+
+def start_server(host="127.0.0.1", port=0, config=None, in_thread=True):
+    """
+    Start the stand-in server. port=0 picks a free port.
+
+    Returns (server, base_url). With in_thread=True the server runs in a
+    daemon thread; call server.shutdown() to stop it.
+    """
+    handler = type("ConfiguredHandler", (MockBMRSHandler,), {"config": config or MockConfig()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    base_url = f"http://{host}:{server.server_address[1]}{API_PREFIX}"
+
+    if in_thread:
+        threading.Thread(target=server.serve_forever, name="mock-bmrs", daemon=True).start()
+    return server, base_url
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Local BMRS stand-in server for offline benchmarking.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency-ms", type=float, default=0.0,
+                        help="Fixed latency added to every response (default: 0).")
+    parser.add_argument("--jitter-ms", type=float, default=0.0,
+                        help="Extra uniform random latency, 0..N ms (default: 0).")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Fraction of requests answered with 503 (default: 0).")
+    parser.add_argument("--throttle-rate", type=float, default=0.0,
+                        help="Fraction of requests answered with 429 + Retry-After (default: 0).")
+    parser.add_argument("--revisions", type=int, default=48,
+                        help="Forecast revisions per settlement period in the evolution endpoint (default: 48).")
+    parser.add_argument("--psr-types", nargs="+", default=list(synth.DEFAULT_PSR_TYPES),
+                        help="psrType values served by the wind & solar endpoints.")
+    parser.add_argument("--padding", type=int, default=0,
+                        help="Filler characters per row to inflate payload size (default: 0).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-live", dest="live", action="store_false",
+                        help="Serve every revision, including ones 'published' in the future.")
+    parser.set_defaults(live=True)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    config = MockConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        revisions=args.revisions,
+        psr_types=args.psr_types,
+        padding=args.padding,
+        seed=args.seed,
+        live=args.live,
+    )
+    server, base_url = start_server(args.host, args.port, config, in_thread=False)
+    print(f" Mock BMRS API serving on {base_url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,22 @@
-import time
 import datetime as dt
 import argparse
+import json
 import os
-import requests as rq
+import threading
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 
+import bmrs_cache
+import bmrs_client
+import bmrs_export
+import bmrs_frames
+import bmrs_polling
+import bmrs_profile
+import bmrs_scheduler
+import bmrs_snapshots
+
 
 # =========================
 # FT-style colour palette
@@ -28,113 +38,178 @@ ft_light_red = "#e2a39b"
 # Core data functions
 # =========================
 
-def fetch_data(date, query_attempt_count=5):
-    """
-    Fetch:
-      - SP 47–48 from previous UTC settlementDate
-      - SP 1–46 from selected UTC settlementDate
-    for indicated day-ahead imbalance evolution.
-    """
-    attempt = 1
-    base_url = "https://data.elexon.co.uk/bmrs/api/v1/forecast/indicated/day-ahead/evolution"
+EVOLUTION_PATH = "/forecast/indicated/day-ahead/evolution"
 
-    datetime_obj = dt.datetime.strptime(date, "%Y-%m-%d")
-    last_day = datetime_obj - dt.timedelta(days=1)
-    last_day_str = last_day.strftime("%Y-%m-%d")
 
-    last_two_p = [47, 48]
-    settlement_periods_curr = list(range(1, 47))
+def fetch_evolution(
+    settlement_date,
+    settlement_periods,
+    query_attempt_count=5,
+    label=None,
+    use_cache=True,
+    conditional=False,
+):
+    """
+    Fetch the indicated imbalance evolution for one UTC settlementDate and
+    a list of settlement periods, retrying transient failures (timeouts,
+    429, 5xx) up to query_attempt_count times via bmrs_client's retry
+    policy. Other errors raise bmrs_client.RequestFailed at once.
 
-    params1 = {
-        "settlementDate": last_day_str,
-        "settlementPeriod": last_two_p,
-        "format": "json",
-    }
-    params2 = {
-        "settlementDate": date,
-        "settlementPeriod": settlement_periods_curr,
+    With conditional=True the request carries the validators of the
+    previous identical request and a 304 Not Modified is returned as-is.
+    """
+    label = label or f"evolution {settlement_date}"
+    params = {
+        "settlementDate": settlement_date,
+        "settlementPeriod": list(settlement_periods),
         "format": "json",
     }
+    ok_status = (200, 304) if conditional else (200,)
+    cache_ttl = bmrs_cache.ttl_for_date(settlement_date) if use_cache else bmrs_client.NO_CACHE
+
+    return bmrs_client.get_with_retry(
+        bmrs_client.api_url(EVOLUTION_PATH),
+        ok_status=ok_status,
+        attempts=query_attempt_count,
+        params=params,
+        label=label,
+        cache_ttl=cache_ttl,
+        conditional=conditional,
+    )
 
-    r1, r2 = None, None
 
-    while attempt <= query_attempt_count:
-        try:
-            r1 = rq.get(base_url, params=params1)
-            time.sleep(1)
-            r2 = rq.get(base_url, params=params2)
-            if r1.status_code == 200 and r2.status_code == 200:
-                break
-        except Exception as e:
-            print(f"Attempt {attempt} failed: {e}. Retrying...")
+@bmrs_profile.stage("fetch")
+def fetch_data(
+    date,
+    query_attempt_count=5,
+    max_concurrency=bmrs_client.DEFAULT_MAX_CONCURRENCY,
+    use_cache=True,
+):
+    """
+    Fetch the indicated day-ahead imbalance evolution for local
+    (Europe/Berlin) day `date`: exactly the settlement periods of
+    bmrs_frames.LocalDay(date), i.e.
+      - the last two SPs of the previous UTC settlementDate
+        (47–48; 45–46 or 49–50 after a clock change)
+      - SP 1–46 of the selected settlementDate (1–44 / 1–48 on 46- / 50-
+        period days)
+
+    The endpoint takes one settlementDate per request, so this is two
+    requests. They are independent and are sent concurrently
+    (max_concurrency=1 sends them one after the other). Each request
+    is retried on its own, so a failure of one does not re-send the other.
+    """
+    (prev_date, prev_periods), (curr_date, curr_periods) = bmrs_frames.LocalDay(date).periods
+
+    r1, r2 = bmrs_client.run_concurrently(
+        [
+            lambda: fetch_evolution(prev_date, prev_periods, query_attempt_count,
+                                    label="evolution D-1", use_cache=use_cache),
+            lambda: fetch_evolution(curr_date, curr_periods, query_attempt_count,
+                                    label="evolution D", use_cache=use_cache),
+        ],
+        max_concurrency=max_concurrency,
+    )
 
-        attempt += 1
-        if attempt <= query_attempt_count:
-            time.sleep(2)
+    return r1, r2
 
-    if r1 is None or r2 is None or r1.status_code != 200 or r2.status_code != 200:
-        raise Exception(f"API request failed after {query_attempt_count} attempts")
 
-    return r1, r2
+@bmrs_profile.stage("decode")
+def req_to_df(*responses):
+    # Accepts any number of evolution responses (fetch_data returns two);
+    # records are parsed straight into typed columns (see bmrs_frames)
+    records = [row for r in responses for row in bmrs_frames.loads(r.content)["data"]]
 
+    full_df = bmrs_frames.records_to_df(records, bmrs_frames.EVOLUTION_SCHEMA)
+    return full_df
 
-def req_to_df(r1, r2):
-    data1 = r1.json()
-    data2 = r2.json()
 
-    p1 = pd.DataFrame(data1["data"])
-    p2 = pd.DataFrame(data2["data"])
+@bmrs_profile.stage("tz_convert")
+def convert_col_to_cest(df, col_names=["startTime", "publishTime"], owned=False):
+    # Adds *_cest columns (on a copy of df unless owned=True, see
+    # bmrs_frames.with_columns); ingestion already parsed the timestamps
+    # (once per distinct string), so this only converts the zone
+    return bmrs_frames.with_columns(
+        df, {f"{col}_cest": bmrs_frames.to_local(df[col]) for col in col_names}, owned=owned
+    )
 
-    full_df = pd.concat([p1, p2], ignore_index=True)
-    return full_df
 
+def latest_per_key(df, key_cols=("settlementDate", "settlementPeriod"), time_col="publishTime_cest", mask=None):
+    """
+    Positions (iloc) of the row with the latest `time_col` for each
+    combination of key_cols, in ascending time order. With a boolean
+    `mask`, only the rows where it is True take part.
 
-def convert_col_to_cest(df, col_names=["startTime", "publishTime"]):
-    df = df.copy()
-    for col in col_names:
-        df[f"{col}_cest"] = (
-            pd.to_datetime(df[col], utc=True)
-            .dt.tz_convert("Europe/Berlin")
-        )
-    return df
+    Linear in the number of rows: keys are integer-encoded, the per-key
+    maximum is a single grouped transform over int64 timestamps, and only
+    the winning rows are sorted. Ties on time keep the last row.
+    """
+    rows = np.arange(len(df)) if mask is None else np.flatnonzero(np.asarray(mask))
+    if len(rows) == 0:
+        return np.array([], dtype=np.int64)
+
+    # Integer key: factorised codes of each column combined positionally
+    key = np.zeros(len(rows), dtype=np.int64)
+    for col in key_cols:
+        codes, uniques = pd.factorize(df[col], sort=False)
+        key = key * (len(uniques) + 1) + codes[rows]
 
+    ts = df[time_col].values.astype("datetime64[ns]").view(np.int64)[rows]
+    latest_ts = pd.Series(ts).groupby(key).transform("max").to_numpy()
 
+    candidates = np.flatnonzero(ts == latest_ts)
+    last_per_key = ~pd.Series(key[candidates]).duplicated(keep="last").to_numpy()
+    winners = candidates[last_per_key]
+
+    return rows[winners[np.argsort(ts[winners], kind="stable")]]
+
+
+@bmrs_profile.stage("latest_per_sp")
 def drop_na_get_final(df):
-    df_valid = df.dropna(subset=["indicatedImbalance"]).copy()
-    df_valid = df_valid.sort_values("publishTime_cest")
-    final_df = (
-        df_valid
-        .groupby(["settlementDate", "settlementPeriod"])
-        .tail(1)
-        .reset_index(drop=True)
-    )
+    # Latest forecast per (settlementDate, settlementPeriod), oldest publish
+    # first; only the winning rows are copied out of df (no dropna copy)
+    valid = df["indicatedImbalance"].notna().to_numpy()
+    final_df = df.iloc[latest_per_key(df, mask=valid)]
+    final_df.index = pd.RangeIndex(len(final_df))
     return final_df
 
 
-def create_custom_ordering(final_df):
-    order = [47, 48] + list(range(1, 47))
-    final_df = final_df.copy()
-    final_df["settlementPeriod"] = final_df["settlementPeriod"].astype(int)
-    final_df["settlementPeriod_str"] = final_df["settlementPeriod"].astype(str)
-    order_str = list(map(str, order))
+def settlement_period_order(date=None):
+    # SP tick labels by local-day position: 47, 48, 1..46 (DST-aware for `date`)
+    return bmrs_frames.local_day_labels(date)
+
+
+@bmrs_profile.stage("ordering")
+def create_custom_ordering(final_df, owned=False):
+    # Integer local-day position (localPeriod) and day-spanning periodKey;
+    # order_str labels the positions of the frame's (main) local day
+    final_df = bmrs_frames.with_columns(final_df, bmrs_frames.local_period_columns(final_df), owned=owned)
+
+    order_str = settlement_period_order(bmrs_frames.main_local_day(final_df["periodKey"]))
     return final_df, order_str
 
 
-def imbalance_sign(df, col="indicatedImbalance"):
-    df = df.copy()
-    df[col + "_sign"] = df[col].apply(
-        lambda x: "Positive" if x >= 0 else "Negative"
+def local_period_axis(order_str):
+    # Integer x-axis (local-day position) labelled with settlement periods
+    return dict(
+        tickmode="array",
+        tickvals=list(range(1, len(order_str) + 1)),
+        ticktext=order_str,
+        range=[0.5, len(order_str) + 0.5],
     )
-    return df
+
+
+@bmrs_profile.stage("sign")
+def imbalance_sign(df, col="indicatedImbalance", owned=False):
+    return bmrs_frames.with_columns(df, {col + "_sign": bmrs_frames.sign_labels(df[col])}, owned=owned)
 
 
 # =========================
 # Plot helpers
 # =========================
 
+@bmrs_profile.stage("figure")
 def plot(df, order_str, output_dir="."):
-    df = df.copy()
-
     latest_publish = df["publishTime_cest"].max()
     main_date = pd.to_datetime(df["settlementDate"]).max()
 
@@ -144,17 +219,18 @@ def plot(df, order_str, output_dir="."):
 
     fig = px.scatter(
         df,
-        x="settlementPeriod_str",
+        x="localPeriod",
         y="indicatedImbalance",
         title=title,
-        category_orders={"settlementPeriod_str": order_str},
+        hover_data={"localPeriod": False, "settlementPeriod": True},
         color="indicatedImbalance_sign",
         color_discrete_map={
             "Positive": ft_green,
             "Negative": ft_red,
         },
         labels={
-            "settlementPeriod_str": "Settlement Period",
+            "localPeriod": "Settlement Period",
+            "settlementPeriod": "Settlement Period",
             "indicatedImbalance": "Indicated Imbalance (MW)",
             "indicatedImbalance_sign": "Imbalance Sign",
         },
@@ -179,6 +255,7 @@ def plot(df, order_str, output_dir="."):
         showgrid=False,
         linecolor=axis_col,
         tickfont=dict(color=tick_col),
+        **local_period_axis(order_str),
     )
 
     fig.update_yaxes(
@@ -200,52 +277,87 @@ def plot(df, order_str, output_dir="."):
     base = f"part1_imbalance_{date_str_file}"
     base = os.path.join(output_dir, base)
 
-    try:
-        fig.write_image(base + ".png")
-        print(f"Saved PNG:  {base}.png")
-    except Exception as e:
-        print(f"FAILED TO SAVE PNG IMAGE ({base}.png): {e}")
-
-    fig.write_image(base + ".png", width=1600, height=900, scale=2)
-    fig.write_html(base + ".html", include_plotlyjs="cdn")
-    print(f"Saved HTML: {base}.html")
+    bmrs_export.export_figure(fig, base, width=1600, height=900, scale=2, data=df)
 
-    fig.show()
+    bmrs_export.show(fig)
 
 
-def full_run_and_plot(date, do_plot=True, output_dir = "."):
-    r1, r2 = fetch_data(date)
+@bmrs_profile.run("full_run_and_plot")
+def full_run_and_plot(
+    date,
+    do_plot=True,
+    output_dir=".",
+    max_concurrency=bmrs_client.DEFAULT_MAX_CONCURRENCY,
+    use_cache=True,
+    store=None,
+):
+    r1, r2 = fetch_data(date, max_concurrency=max_concurrency, use_cache=use_cache)
     df_raw = req_to_df(r1, r2)
-    df_raw = convert_col_to_cest(df_raw)
+
+    if store is not None:
+        n_new = store.append(df_raw)
+        print(f" Snapshot store: {n_new} new revision(s) recorded ({len(store)} total).")
+
+    # Every frame below is built here, so the stages hand them over
+    # instead of copying (owned=True)
+    df_raw = convert_col_to_cest(df_raw, owned=True)
     final_df = drop_na_get_final(df_raw)
-    final_df, order_str = create_custom_ordering(final_df)
-    final_df = imbalance_sign(final_df)
+    final_df, order_str = create_custom_ordering(final_df, owned=True)
+    final_df = imbalance_sign(final_df, owned=True)
 
-    if do_plot:
+    if do_plot and not final_df.empty:
         plot(final_df, order_str, output_dir=output_dir)
 
     return final_df
 
 
-def plot_diff(prev_df, new_df, order_str, title_suffix="", output_dir ="."):
-    # Plot the difference between previous and new forecast versions
-    prev_df = prev_df.copy()
-    new_df = new_df.copy()
+def snapshot_from_store(store, date):
+    """
+    Rebuild the local-day final_df for `date` (the settlement periods of
+    bmrs_frames.LocalDay(date)) from the snapshot store, without touching
+    the API.
+
+    Returns None unless the store holds every settlement period of that
+    day: fold_in only adds revisions newer than the watermark, so periods
+    missing from the store (trimmed, or never recorded) would never be
+    filled in.
+    """
+    local_day = bmrs_frames.LocalDay(date)
+    df_raw = bmrs_frames.concat_typed([
+        store.history(settlement_date, periods)
+        for settlement_date, periods in local_day.periods
+    ])
+    if df_raw.empty:
+        return None
+
+    df_raw = convert_col_to_cest(df_raw, owned=True)
+    final_df = drop_na_get_final(df_raw)
+    if len(final_df) != local_day.n_periods:
+        print(f" Snapshot store holds {len(final_df)} of {local_day.n_periods} settlement periods for {date}.")
+        return None
+
+    final_df, _ = create_custom_ordering(final_df, owned=True)
+    final_df = imbalance_sign(final_df, owned=True)
+    return final_df
 
-    # Rename for clarity
-    prev_df = prev_df.rename(columns={"indicatedImbalance": "indicatedImbalance_prev"})
-    new_df = new_df.rename(columns={"indicatedImbalance": "indicatedImbalance_new"})
+
+@bmrs_profile.stage("figure_diff")
+def plot_diff(prev_df, new_df, order_str, title_suffix="", output_dir ="."):
+    # Plot the difference between previous and new forecast versions.
+    # The inputs are only read; the merge suffixes name the two versions
+    # (indicatedImbalance_prev / indicatedImbalance_new).
 
     # Dates present in each snapshot
     prev_dates = prev_df["settlementDate"].unique()
     new_dates = new_df["settlementDate"].unique()
 
-    # Decide merge key: same date vs different date(s)
+    # Decide merge key (integers only): the same period of the same local
+    # day, or the same local-day position when the dates differ
     if len(prev_dates) == 1 and len(new_dates) == 1 and prev_dates[0] == new_dates[0]:
-        merge_on = ["settlementDate", "settlementPeriod"]
+        merge_on = ["periodKey", "localPeriod"]
         is_same_date = True
     else:
-        merge_on = ["settlementPeriod"]
+        merge_on = ["localPeriod"]
         is_same_date = False
 
     merged = prev_df.merge(
@@ -255,23 +367,17 @@ def plot_diff(prev_df, new_df, order_str, title_suffix="", output_dir ="."):
         suffixes=("_prev", "_new"),
     )
 
-    # Ensure types and SP labels
-    merged["settlementPeriod"] = merged["settlementPeriod"].astype(int)
-    merged["settlementPeriod_str"] = merged["settlementPeriod"].astype(str)
+    # SP shown on hover (from the newer snapshot where it has the period);
+    # the outer merge makes the suffixed columns float, so restore int8
+    merged["settlementPeriod"] = (
+        merged["settlementPeriod_new"].combine_first(merged["settlementPeriod_prev"]).astype(np.int8)
+    )
 
     # Compute delta and signs
     merged["delta"] = merged["indicatedImbalance_new"] - merged["indicatedImbalance_prev"]
 
-    merged["sign_new"] = merged["indicatedImbalance_new"].apply(
-        lambda x: "Positive" if pd.notna(x) and x >= 0
-        else "Negative" if pd.notna(x)
-        else None
-    )
-    merged["sign_prev"] = merged["indicatedImbalance_prev"].apply(
-        lambda x: "Positive" if pd.notna(x) and x >= 0
-        else "Negative" if pd.notna(x)
-        else None
-    )
+    merged["sign_new"] = bmrs_frames.sign_labels(merged["indicatedImbalance_new"])
+    merged["sign_prev"] = bmrs_frames.sign_labels(merged["indicatedImbalance_prev"])
 
     # Masks for alignment
     prev_mask = merged["indicatedImbalance_prev"].notna()
@@ -286,14 +392,15 @@ def plot_diff(prev_df, new_df, order_str, title_suffix="", output_dir ="."):
 
     if prev_positive_mask.any():
         fig.add_trace(go.Scatter(
-            x=merged.loc[prev_positive_mask, "settlementPeriod_str"],
+            x=merged.loc[prev_positive_mask, "localPeriod"],
+            customdata=merged.loc[prev_positive_mask, "settlementPeriod"],
             y=merged.loc[prev_positive_mask, "indicatedImbalance_prev"],
             mode="markers",
             name="Previous (Positive)",
             marker=dict(size=8, color=ft_light_green, opacity=0.7),
             showlegend=True,
             hovertemplate=(
-                "Settlement Period: %{x}<br>"
+                "Settlement Period: %{customdata}<br>"
                 "Indicated Imbalance (MW): %{y}"
                 "<extra>Previous</extra>"
             ),
@@ -301,14 +408,15 @@ def plot_diff(prev_df, new_df, order_str, title_suffix="", output_dir ="."):
 
     if prev_negative_mask.any():
         fig.add_trace(go.Scatter(
-            x=merged.loc[prev_negative_mask, "settlementPeriod_str"],
+            x=merged.loc[prev_negative_mask, "localPeriod"],
+            customdata=merged.loc[prev_negative_mask, "settlementPeriod"],
             y=merged.loc[prev_negative_mask, "indicatedImbalance_prev"],
             mode="markers",
             name="Previous (Negative)",
             marker=dict(size=8, color=ft_light_red, opacity=0.7),
             showlegend=True,
             hovertemplate=(
-                "Settlement Period: %{x}<br>"
+                "Settlement Period: %{customdata}<br>"
                 "Indicated Imbalance (MW): %{y}"
                 "<extra>Previous</extra>"
             ),
@@ -320,7 +428,8 @@ def plot_diff(prev_df, new_df, order_str, title_suffix="", output_dir ="."):
 
     if new_positive_mask.any():
         fig.add_trace(go.Scatter(
-            x=merged.loc[new_positive_mask, "settlementPeriod_str"],
+            x=merged.loc[new_positive_mask, "localPeriod"],
+            customdata=merged.loc[new_positive_mask, "settlementPeriod"],
             y=merged.loc[new_positive_mask, "indicatedImbalance_new"],
             mode="markers",
             name="Latest (Positive)",
@@ -328,7 +437,7 @@ def plot_diff(prev_df, new_df, order_str, title_suffix="", output_dir ="."):
                         line=dict(width=1, color="#3f6b39")),
             showlegend=True,
             hovertemplate=(
-                "Settlement Period: %{x}<br>"
+                "Settlement Period: %{customdata}<br>"
                 "Indicated Imbalance (MW): %{y}"
                 "<extra>Latest</extra>"
             ),
@@ -336,7 +445,8 @@ def plot_diff(prev_df, new_df, order_str, title_suffix="", output_dir ="."):
 
     if new_negative_mask.any():
         fig.add_trace(go.Scatter(
-            x=merged.loc[new_negative_mask, "settlementPeriod_str"],
+            x=merged.loc[new_negative_mask, "localPeriod"],
+            customdata=merged.loc[new_negative_mask, "settlementPeriod"],
             y=merged.loc[new_negative_mask, "indicatedImbalance_new"],
             mode="markers",
             name="Latest (Negative)",
@@ -344,25 +454,36 @@ def plot_diff(prev_df, new_df, order_str, title_suffix="", output_dir ="."):
                         line=dict(width=1, color="#7c2f28")),
             showlegend=True,
             hovertemplate=(
-                "Settlement Period: %{x}<br>"
+                "Settlement Period: %{customdata}<br>"
                 "Indicated Imbalance (MW): %{y}"
                 "<extra>Latest</extra>"
             ),
         ))
 
-    # Line between old and new points
-    if both_mask.any():
-        for _, row in merged[both_mask].iterrows():
-            if pd.notna(row["indicatedImbalance_prev"]) and pd.notna(row["indicatedImbalance_new"]):
-                color = ft_green if row["delta"] > 0 else ft_red
-                fig.add_trace(go.Scatter(
-                    x=[row["settlementPeriod_str"], row["settlementPeriod_str"]],
-                    y=[row["indicatedImbalance_prev"], row["indicatedImbalance_new"]],
-                    mode="lines",
-                    line=dict(color=color, width=2, dash="dot"),
-                    showlegend=False,
-                    hoverinfo="skip",
-                ))
+    # Line between old and new points: one trace per direction, each
+    # old→new segment separated from the next by a gap
+    rising = merged["delta"] > 0
+    for seg_mask, color in ((both_mask & rising, ft_green), (both_mask & ~rising, ft_red)):
+        if not seg_mask.any():
+            continue
+
+        n_seg = int(seg_mask.sum())
+        seg_x = np.full(3 * n_seg, np.nan)
+        seg_y = np.full(3 * n_seg, np.nan)
+        seg_x[0::3] = merged.loc[seg_mask, "localPeriod"].to_numpy()
+        seg_x[1::3] = seg_x[0::3]
+        seg_y[0::3] = merged.loc[seg_mask, "indicatedImbalance_prev"].to_numpy()
+        seg_y[1::3] = merged.loc[seg_mask, "indicatedImbalance_new"].to_numpy()
+
+        fig.add_trace(go.Scatter(
+            x=seg_x,
+            y=seg_y,
+            mode="lines",
+            line=dict(color=color, width=2, dash="dot"),
+            connectgaps=False,
+            showlegend=False,
+            hoverinfo="skip",
+        ))
 
     # Build title
     prev_publish = prev_df["publishTime_cest"].max()
@@ -376,8 +497,8 @@ def plot_diff(prev_df, new_df, order_str, title_suffix="", output_dir ="."):
         date_str = main_date.strftime("%d %b %Y")
         base_title = f"Imbalance per Settlement Period {date_str}: {prev_time_str} vs {new_time_str}"
     else:
-        prev_date = pd.to_datetime(prev_dates.max())
-        new_date = pd.to_datetime(new_dates.max())
+        prev_date = pd.to_datetime(pd.Series(prev_dates).astype(str)).max()
+        new_date = pd.to_datetime(pd.Series(new_dates).astype(str)).max()
         prev_date_str = prev_date.strftime("%d %b %Y")
         new_date_str = new_date.strftime("%d %b %Y")
         base_title = (
@@ -398,8 +519,7 @@ def plot_diff(prev_df, new_df, order_str, title_suffix="", output_dir ="."):
     )
 
     fig.update_xaxes(
-        categoryorder="array",
-        categoryarray=order_str,
+        **local_period_axis(order_str),
         title="Settlement Period",
         showgrid=True,
         gridwidth=1,
@@ -434,122 +554,497 @@ def plot_diff(prev_df, new_df, order_str, title_suffix="", output_dir ="."):
     base = f"part1_diff_{date_str_file}_{time_str_file}"
     base = os.path.join(output_dir, base)
 
-    try:
-        fig.write_image(base + ".png")
-        print(f"Saved PNG:  {base}.png")
-    except Exception as e:
-        print(f"FAILED TO SAVE PNG IMAGE ({base}.png): {e}")
-
-    fig.write_image(base + ".png", width=1600, height=900, scale=2)
-    fig.write_html(base + ".html", include_plotlyjs="cdn")
-    print(f"Saved HTML: {base}.html")
+    bmrs_export.export_figure(fig, base, width=1600, height=900, scale=2, data=merged)
 
-    fig.show()
+    bmrs_export.show(fig)
 
 
 # =========================
 # Auto-update machinery
 # =========================
 
-def countdown_timer(seconds):
-    # Countdown Timer to inform user of query attempts
-    while seconds:
-        mins, secs = divmod(seconds, 60)
-        hours, mins = divmod(mins, 60)
-        timeformat = f" Next update in: {hours:02d}:{mins:02d}:{secs:02d}"
-        print(timeformat, end="\r", flush=True)
-        time.sleep(1)
-        seconds -= 1
-    print(" Checking for new data..." + " " * 30)
+def _latest_publish_time(r):
+    # Max publishTime straight from the raw payload, without building a
+    # DataFrame. BMRS timestamps are uniform ISO-8601 UTC strings, so the
+    # lexical max is the chronological max.
+    times = [row["publishTime"] for row in r.json()["data"] if row.get("publishTime")]
+    if not times:
+        return None
+    return pd.Timestamp(max(times)).tz_convert("Europe/Berlin")
 
 
-def auto_update_loop(
+class LocalDayState:
+    """
+    Latest forecast per (settlementDate, settlementPeriod) for one local
+    day, plus its watermark (latest publishTime_cest folded in so far).
+
+    `fold_in` only parses and processes the raw records published after
+    the watermark, and replaces just the SPs they revise, so per-poll work
+    scales with the size of the update rather than the size of the day.
+    """
+
+    KEY_COLS = ["settlementDate", "settlementPeriod"]
+
+    def __init__(self, final_df):
+        # final_df: output of full_run_and_plot / snapshot_from_store.
+        # An empty frame (nothing published yet) has a NaT watermark.
+        self.final_df = final_df
+        self.watermark = final_df["publishTime_cest"].max()
+
+    @bmrs_profile.stage("fold_in")
+    def fold_in(self, records, store=None):
+        """
+        Fold raw evolution records (the "data" rows of the API payload)
+        into the state. Rows newer than the watermark are recorded in
+        `store` if given.
+
+        Returns the updated final_df, or None when nothing is newer.
+        """
+        # BMRS timestamps are uniform ISO-8601 UTC strings, so comparing
+        # the raw strings selects newer rows without parsing the rest
+        if pd.isna(self.watermark):
+            cutoff = ""
+        else:
+            cutoff = self.watermark.tz_convert("UTC").strftime(bmrs_frames.BMRS_TIME_FORMAT)
+        fresh = [row for row in records if (row.get("publishTime") or "") > cutoff]
+        if not fresh:
+            return None
+
+        new_rows = bmrs_frames.records_to_df(fresh, bmrs_frames.EVOLUTION_SCHEMA)
+        if store is not None:
+            n_new = store.append(new_rows)
+            print(f" Snapshot store: {n_new} new revision(s) recorded ({len(store)} total).")
+
+        # Derived columns for the revised SPs only
+        changed = drop_na_get_final(convert_col_to_cest(new_rows, owned=True))
+        if changed.empty:
+            return None
+        changed, _ = create_custom_ordering(changed, owned=True)
+        changed = imbalance_sign(changed, owned=True)
+
+        old = self.final_df
+        kept = old[~np.isin(old["periodKey"].to_numpy(), changed["periodKey"].to_numpy())]
+
+        # Every changed row is newer than every kept row, so appending
+        # keeps the frame in ascending publish order
+        self.final_df = bmrs_frames.concat_typed([kept, changed]) if len(kept) else changed
+        self.watermark = changed["publishTime_cest"].max()
+        print(f" Folded in {len(fresh)} new row(s); {len(changed)} SP(s) revised.")
+        return self.final_df
+
+
+@bmrs_profile.run("check_for_update")
+def check_for_update(
     date,
-    update_interval_minutes=30,
-    retry=True,
-    retry_increments=(30, 60, 120),
-    output_dir = "."
+    state,
+    conditional=True,
+    max_concurrency=bmrs_client.DEFAULT_MAX_CONCURRENCY,
+    store=None,
 ):
-    # Code to automatically update and plot new data as it becomes available
-    print(f" Starting auto-update loop for settlement date: {date}")
+    """
+    Poll once for a forecast revision newer than `state.watermark`
+    (a LocalDayState holding the latest snapshot seen).
+
+    Returns the new final_df when there is one (the state is updated in
+    place), otherwise None.
+
+    conditional=True first sends a small probe for the last settlement
+    period of the local day only (every publish revises all remaining
+    periods, so its latest publishTime is the day's watermark), carrying
+    ETag / Last-Modified validators when the server provides them. A 304 or
+    an unchanged publishTime short-circuits before any DataFrame is built;
+    only a genuine revision triggers the full (uncached) download.
+
+    conditional=False downloads the full day on every poll.
+
+    Either way only rows published after the watermark are processed (see
+    LocalDayState.fold_in), and recorded in `store` (a SnapshotStore) if given.
+    """
+    if conditional:
+        probe_date, probe_period = bmrs_frames.LocalDay(date).last_period
+        probe = fetch_evolution(probe_date, [probe_period], label="poll probe",
+                                use_cache=False, conditional=True)
+        if probe.status_code == 304:
+            print(" Probe: not modified (304).")
+            return None
+
+        latest = _latest_publish_time(probe)
+        print(f" Probe latest publish: {latest}")
+        if latest is None or (pd.notna(state.watermark) and latest <= state.watermark):
+            return None
+
+    r1, r2 = fetch_data(date, max_concurrency=max_concurrency, use_cache=False)
+    records = [row for r in (r1, r2) for row in bmrs_frames.loads(r.content)["data"]]
+
+    new_df = state.fold_in(records, store=store)
+    print(f" Latest publish: {state.watermark}")
+    return new_df
 
-    # Initial snapshot and plot
-    print(" Fetching and plotting initial data...")
-    prev_df = full_run_and_plot(date, do_plot=True, output_dir=output_dir)
-    prev_df, order_str = create_custom_ordering(prev_df)
-    prev_max_publish = prev_df["publishTime_cest"].max()
-    print(f" Initial latest publishTime_cest: {prev_max_publish}")
 
-    update_cycle = 1
+class ImbalanceWatch:
+    """
+    Scheduled auto-update for one settlement date.
+
+    Waits for the next expected publish time (latest publishTime_cest +
+    update_interval_minutes) and polls until a new revision appears,
+    plotting every new revision against the previous one. Each poll is a
+    job on a shared bmrs_scheduler.Scheduler, so nothing runs in between.
 
-    while True:
-        next_expected = prev_max_publish + dt.timedelta(minutes=update_interval_minutes)
+    Poll timing comes from a bmrs_polling.PublishLagModel: until it has
+    learned the publish cadence and lag, polls follow retry_increments
+    (seconds between polls); afterwards they sit at the `poll_quantiles`
+    of the observed lag. Late data is polled with exponential backoff up
+    to backoff_max_minutes. adaptive=False keeps the fixed schedule.
 
-        now = dt.datetime.now(tz=next_expected.tzinfo)
-        seconds_to_wait = (next_expected - now).total_seconds()
+    `publish(name, diff_df)`, if given, receives the per-SP changes
+    (bmrs_frames.diff_frames) of every new revision.
+    """
+
+    def __init__(
+        self,
+        date,
+        scheduler,
+        update_interval_minutes=30,
+        retry=True,
+        retry_increments=(30, 60, 120),
+        output_dir=".",
+        max_concurrency=bmrs_client.DEFAULT_MAX_CONCURRENCY,
+        conditional=True,
+        do_plot=True,
+        store=None,
+        publish=None,
+        adaptive=True,
+        poll_quantiles=bmrs_polling.DEFAULT_QUANTILES,
+        backoff_max_minutes=bmrs_polling.DEFAULT_BACKOFF_MAX_S / 60,
+    ):
+        self.date = date
+        self.scheduler = scheduler
+        retry_increments = tuple(retry_increments) if retry else ()
+        self.poll_model = bmrs_polling.PublishLagModel(
+            default_interval_s=update_interval_minutes * 60,
+            fallback_offsets_s=np.cumsum((0,) + retry_increments),
+            quantiles=poll_quantiles,
+            backoff_max_s=backoff_max_minutes * 60,
+            learn=adaptive,
+        )
+        self.output_dir = output_dir
+        self.max_concurrency = max_concurrency
+        self.conditional = conditional
+        self.do_plot = do_plot
+        self.store = store
+        self.publish = publish
+        self.name = f"imbalance {date}"
+
+        self.order_str = settlement_period_order(date)
+        self.state = None
+        self.prev_df = None
+        self.update_cycle = 1
+        self._expected = None
+        self._attempt = 0
+        self._last_poll_at = None
+        self._job = None
+
+    def start(self):
+        # Initial snapshot and plot (warm start from the store when possible)
+        prev_df = snapshot_from_store(self.store, self.date) if self.store is not None else None
+
+        if prev_df is not None:
+            print(f" Warm start from snapshot store {self.store.path}")
+            if self.do_plot:
+                plot(prev_df, self.order_str, output_dir=self.output_dir)
+        else:
+            print(" Fetching and plotting initial data...")
+            prev_df = full_run_and_plot(self.date, do_plot=self.do_plot, output_dir=self.output_dir,
+                                        max_concurrency=self.max_concurrency, store=self.store)
+
+        # Later polls fold only newer revisions into this state
+        self.prev_df = prev_df
+        self.state = LocalDayState(prev_df)
+        print(f" Initial latest publishTime_cest: {self.state.watermark}")
+
+        # Seed the cadence estimate with the publish history already known
+        if self.store is not None:
+            self.poll_model.observe_publishes(self.store.history(self.date)["publishTime"].unique())
+        self.poll_model.observe_publishes([self.state.watermark])
+        self._last_poll_at = dt.datetime.now(dt.timezone.utc)
+
+        self._start_cycle()
+
+    def stop(self):
+        if self._job is not None:
+            self.scheduler.cancel(self._job)
+            self._job = None
+
+    def _start_cycle(self):
+        now = dt.datetime.now(dt.timezone.utc)
+        if pd.isna(self.state.watermark):
+            # Nothing published for this day yet: look again one cadence from now
+            self._expected = now + dt.timedelta(seconds=self.poll_model.cadence_s())
+        else:
+            self._expected = self.poll_model.expected_publish(self.state.watermark)
+        seconds_to_wait = (self._expected - now).total_seconds()
 
         if seconds_to_wait > 0:
-            minutes_to_wait = seconds_to_wait / 60
             print(
-                f"\n Update cycle {update_cycle}: "
-                f"waiting {minutes_to_wait:.1f} minutes until next expected update at {next_expected}..."
+                f"\n Update cycle {self.update_cycle}: "
+                f"waiting {seconds_to_wait / 60:.1f} minutes until next expected update at {self._expected}..."
             )
-            countdown_timer(int(seconds_to_wait))
         else:
             print(
-                f"\n Update cycle {update_cycle}: "
-                f"expected update time {next_expected} is already "
+                f"\n Update cycle {self.update_cycle}: "
+                f"expected update time {self._expected} is already "
                 f"{abs(seconds_to_wait) / 60:.1f} minutes in the past, checking now..."
             )
 
-        # First attempt to fetch new data
-        print(f" Update cycle {update_cycle}: Checking for new data...")
-        new_df = full_run_and_plot(date, do_plot=False, output_dir=output_dir)
-        new_df, _ = create_custom_ordering(new_df)
-        new_max_publish = new_df["publishTime_cest"].max()
-
-        print(f"Previous publish: {prev_max_publish}")
-        print(f"New publish:      {new_max_publish}")
-        print(f"Has new data:     {new_max_publish > prev_max_publish}")
-
-        if new_max_publish > prev_max_publish:
-            print(" New data found on first attempt!")
-            plot_diff(prev_df, new_df, order_str, title_suffix=f"Update {update_cycle}")
-            prev_df = new_df
-            prev_max_publish = new_max_publish
-            update_cycle += 1
-            continue
+        self._attempt = 0
+        self._schedule_poll(now)
 
-        if not retry:
-            print(" No new data, and retry disabled. Loop continues to next interval.")
-            update_cycle += 1
-            continue
+    def _schedule_poll(self, now):
+        when, self._attempt = self.poll_model.next_poll(self._expected, self._attempt, now)
+        name = f"{self.name} update {self.update_cycle}"
+        if self._attempt:
+            name += f" check {self._attempt + 1}"
+        self._job = self.scheduler.call_at(when, self._poll, name=name)
+        return when
+
+    def _poll(self):
+        polled_at = dt.datetime.now(dt.timezone.utc)
+        is_retry = self._attempt > 0
+        print(f" Update cycle {self.update_cycle}: Checking for new data...")
+
+        try:
+            new_df = check_for_update(self.date, self.state, conditional=self.conditional,
+                                      max_concurrency=self.max_concurrency, store=self.store)
+        except Exception as e:
+            print(f" Update cycle {self.update_cycle}: check failed: {e}")
+            new_df = None
+
+        print(f" Has new data: {new_df is not None} (latest publish {self.state.watermark})")
+
+        if new_df is not None:
+            print(" New data found after retry!" if is_retry else " New data found on first attempt!")
+            self.poll_model.observe_arrival(self.state.watermark, polled_at, self._last_poll_at)
+            self._last_poll_at = polled_at
+
+            # A failed render, export or publish must not end the watch:
+            # the next cycle is scheduled regardless
+            try:
+                if self.do_plot and self.prev_df.empty:
+                    plot(new_df, self.order_str, output_dir=self.output_dir)
+                elif self.do_plot:
+                    suffix = f"Update {self.update_cycle}" + (" (Retry)" if is_retry else "")
+                    plot_diff(self.prev_df, new_df, self.order_str, title_suffix=suffix, output_dir=self.output_dir)
+            except Exception as e:
+                print(f" Update cycle {self.update_cycle}: plot failed: {e}")
+            if self.publish is not None:
+                try:
+                    self.publish(self.name, bmrs_frames.diff_frames(
+                        self.prev_df, new_df, LocalDayState.KEY_COLS, "indicatedImbalance"
+                    ))
+                except Exception as e:
+                    print(f" Update cycle {self.update_cycle}: publish failed: {e}")
+            self.prev_df = new_df
+            self._end_cycle()
+            return
+
+        # Not there yet: next planned lag offset, then exponential backoff
+        self._last_poll_at = polled_at
+        self._attempt += 1
+        now = dt.datetime.now(dt.timezone.utc)
+        when = self._schedule_poll(now)
+        phase = "planned" if self._attempt < len(self.poll_model.offsets_s()) else "backoff"
+        print(f" No new data yet; next check in {(when - now).total_seconds():.0f} seconds ({phase}).")
+
+    def _end_cycle(self):
+        bmrs_client.print_timing_summary()
+        print(f" Poll timing: {self.poll_model.summary()}")
+        self.update_cycle += 1
+        self._start_cycle()
+
+
+def auto_update_loop(
+    date,
+    update_interval_minutes=30,
+    retry=True,
+    retry_increments=(30, 60, 120),
+    output_dir = ".",
+    max_concurrency=bmrs_client.DEFAULT_MAX_CONCURRENCY,
+    conditional=True,
+    do_plot=True,
+    store=None,
+    adaptive=True,
+    poll_quantiles=bmrs_polling.DEFAULT_QUANTILES,
+    backoff_max_minutes=bmrs_polling.DEFAULT_BACKOFF_MAX_S / 60,
+):
+    # Code to automatically update and plot new data as it becomes available.
+    # do_plot=False tracks updates without building any figures.
+    # With a SnapshotStore every revision seen is persisted, and a restart
+    # resumes from the stored snapshot instead of re-downloading the day.
+    # Runs until interrupted (Ctrl+C / SIGTERM).
+    print(f" Starting auto-update loop for settlement date: {date}")
+
+    # One warm Kaleido renderer for every PNG this loop writes
+    if do_plot and bmrs_export.wants("png") and bmrs_export.start_renderer():
+        print(" PNG renderer started (reused across updates).")
+
+    scheduler = bmrs_scheduler.Scheduler()
+    watch = ImbalanceWatch(
+        date,
+        scheduler,
+        update_interval_minutes=update_interval_minutes,
+        retry=retry,
+        retry_increments=retry_increments,
+        output_dir=output_dir,
+        max_concurrency=max_concurrency,
+        conditional=conditional,
+        do_plot=do_plot,
+        store=store,
+        adaptive=adaptive,
+        poll_quantiles=poll_quantiles,
+        backoff_max_minutes=backoff_max_minutes,
+    )
+    watch.start()
+    scheduler.run()
+
+
+# =========================
+# Backfill (multi-day history)
+# =========================
+
+BACKFILL_CHECKPOINT = "_checkpoint.json"
+ALL_SETTLEMENT_PERIODS = list(range(1, 51))   # 50 covers clock-change days
+
+
+def _backfill_dates(start, end):
+    # Settlement dates needed for local days start..end (inclusive);
+    # D-1 supplies SP 47–48 of local day D.
+    start_obj = dt.datetime.strptime(start, "%Y-%m-%d") - dt.timedelta(days=1)
+    end_obj = dt.datetime.strptime(end, "%Y-%m-%d")
+    if end_obj <= start_obj:
+        raise ValueError(f"Backfill end {end} is before start {start}")
+
+    n_days = (end_obj - start_obj).days
+    return [(start_obj + dt.timedelta(days=i)).strftime("%Y-%m-%d") for i in range(n_days + 1)]
+
+
+def _load_checkpoint(store_dir):
+    path = os.path.join(store_dir, BACKFILL_CHECKPOINT)
+    if not os.path.exists(path):
+        return set()
+    with open(path) as f:
+        return set(json.load(f)["completed"])
+
+
+def _save_checkpoint(store_dir, completed):
+    # Write-then-rename so a crash never leaves a truncated checkpoint
+    path = os.path.join(store_dir, BACKFILL_CHECKPOINT)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({"completed": sorted(completed)}, f)
+    os.replace(tmp, path)
+
+
+def _backfill_window(settlement_date, store_dir, query_attempt_count=5):
+    # One API window = every SP of one settlementDate in a single request
+    r = fetch_evolution(
+        settlement_date,
+        ALL_SETTLEMENT_PERIODS,
+        query_attempt_count,
+        label=f"backfill {settlement_date}",
+    )
+    df = req_to_df(r)
 
-        print(" No new data on first attempt. Starting retry sequence...")
-        retry_found_new_data = False
+    if not df.empty:
+        path = os.path.join(store_dir, f"{settlement_date}.parquet")
+        tmp = path + ".tmp"
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, path)
 
-        for inc in retry_increments:
-            print(f" Retrying in {inc} seconds...")
-            countdown_timer(inc)
+    return len(df)
 
-            new_df = full_run_and_plot(date, do_plot=False, output_dir=output_dir)
-            new_df, _ = create_custom_ordering(new_df)
-            new_max_publish = new_df["publishTime_cest"].max()
 
-            print(f" Retry check — new publish: {new_max_publish}")
+def backfill(
+    start,
+    end,
+    store_dir="bmrs_store",
+    max_concurrency=bmrs_client.DEFAULT_MAX_CONCURRENCY,
+    rate_limit=None,
+    query_attempt_count=5,
+):
+    """
+    Download the full indicated imbalance evolution for local days
+    start..end (inclusive, 'YYYY-MM-DD') into a Parquet store.
+
+    - The range is split into one window per UTC settlementDate (all SPs
+      in a single request), including D-1 of the first day.
+    - Windows are fetched concurrently (max_concurrency) under a shared
+      token-bucket rate limit (bmrs_client; rate_limit requests/second
+      overrides it for this run, None keeps the one configured).
+    - Each window is written to `<store_dir>/<settlementDate>.parquet` and
+      recorded in `<store_dir>/_checkpoint.json`; re-running after a crash
+      skips completed windows. Dates from today onwards are never marked
+      complete, as their forecasts are still being revised.
+
+    Returns the total number of rows written in this run.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+
+    dates = _backfill_dates(start, end)
+    completed = _load_checkpoint(store_dir)
+    pending = [d for d in dates if d not in completed]
+    today = dt.datetime.now(dt.timezone.utc).strftime("%Y-%m-%d")
+
+    print(
+        f" Backfill {start} → {end}: {len(dates)} settlement dates, "
+        f"{len(dates) - len(pending)} already done, {len(pending)} to fetch."
+    )
+
+    lock = threading.Lock()
+
+    def run_window(settlement_date):
+        n_rows = _backfill_window(settlement_date, store_dir, query_attempt_count)
+        with lock:
+            if settlement_date < today:
+                completed.add(settlement_date)
+                _save_checkpoint(store_dir, completed)
+            print(f" Backfilled {settlement_date}: {n_rows} rows")
+        return n_rows
+
+    if rate_limit is not None:
+        previous_limiter = bmrs_client.set_rate_limit(rate_limit)
+
+    try:
+        counts = bmrs_client.run_concurrently(
+            [lambda d=d: run_window(d) for d in pending],
+            max_concurrency=max_concurrency,
+        )
+    finally:
+        if rate_limit is not None:
+            bmrs_client.set_rate_limit(previous_limiter)
+
+    total = sum(counts)
+    print(f" Backfill complete: {total} rows written to {store_dir}")
+    return total
 
-            if new_max_publish > prev_max_publish:
-                print(" New data found after retry!")
-                plot_diff(prev_df, new_df, order_str, title_suffix=f"Update {update_cycle} (Retry)", output_dir=output_dir)
-                prev_df = new_df
-                prev_max_publish = new_max_publish
-                retry_found_new_data = True
-                break
 
-        if not retry_found_new_data:
-            print(" No new data after all retries. Waiting until next expected interval.")
+def load_backfill(store_dir="bmrs_store", start=None, end=None):
+    """
+    Read the raw evolution rows written by `backfill` for settlement dates
+    in [start, end] (either bound may be None).
+    """
+    files = sorted(
+        f for f in os.listdir(store_dir)
+        if f.endswith(".parquet")
+        and (start is None or f[:10] >= start)
+        and (end is None or f[:10] <= end)
+    )
+    if not files:
+        return pd.DataFrame()
 
-        update_cycle += 1
+    return pd.concat(
+        [pd.read_parquet(os.path.join(store_dir, f)) for f in files],
+        ignore_index=True,
+    )
 
 
 # =========================
@@ -564,7 +1059,8 @@ def parse_args():
         "--date",
         default="2025-12-07",
         help="Settlement date (YYYY-MM-DD) for the BMRS day. "
-             "Local C(E)ST day uses SP 47–48 from previous UTC day and 1–46 from this day.",
+             "Local C(E)ST day uses SP 47–48 from previous UTC day and 1–46 from this day "
+             "(45–46 / 49–50 and 1–44 / 1–48 around clock changes).",
     )
     parser.add_argument(
         "--update-interval-minutes",
@@ -585,7 +1081,9 @@ def parse_args():
         "--no-retry",
         dest="retry",
         action="store_false",
-        help="Disable short retry sequence between main intervals.",
+        help="Disable the short retry sequence (used until poll timing is learned, and always with "
+             "--fixed-poll): poll once at the expected time, then back off exponentially "
+             "(60 s doubling up to --backoff-max-minutes) until new data appears.",
     )
 
     parser.add_argument(
@@ -594,7 +1092,63 @@ def parse_args():
         help="Directory to save output plots (default: current directory).",
     
     )
-    parser.set_defaults(retry=True)
+    bmrs_client.add_cli_arguments(parser)
+    bmrs_export.add_cli_arguments(parser)
+    bmrs_profile.add_cli_arguments(parser)
+    parser.add_argument(
+        "--full-poll",
+        dest="conditional",
+        action="store_false",
+        help="Re-download and re-process the full day on every poll instead of "
+             "sending a small conditional probe first.",
+    )
+    parser.add_argument(
+        "--poll-quantiles",
+        type=float,
+        nargs="+",
+        default=list(bmrs_polling.DEFAULT_QUANTILES),
+        help="Once the publish lag has been learned, poll at these quantiles of it "
+             "(default: 0.5 0.9). Lower/more quantiles = lower latency, more requests.",
+    )
+    parser.add_argument(
+        "--backoff-max-minutes",
+        type=float,
+        default=bmrs_polling.DEFAULT_BACKOFF_MAX_S / 60,
+        help="Upper bound on the gap between polls while data is late (default: 15).",
+    )
+    parser.add_argument(
+        "--fixed-poll",
+        dest="adaptive",
+        action="store_false",
+        help="Do not learn poll timing; always use --update-interval-minutes and --retry-increments.",
+    )
+    parser.add_argument(
+        "--backfill-to",
+        default=None,
+        metavar="YYYY-MM-DD",
+        help="Backfill mode: download the evolution history for local days "
+             "--date..--backfill-to into --store-dir instead of running the "
+             "auto-update loop. Resumes from the store's checkpoint.",
+    )
+    parser.add_argument(
+        "--store-dir",
+        default="bmrs_store",
+        help="Parquet store directory used by --backfill-to (default: bmrs_store).",
+    )
+    parser.add_argument(
+        "--snapshot-db",
+        default=bmrs_snapshots.DEFAULT_PATH,
+        help="SQLite file recording every forecast revision seen by the auto-update loop; "
+             f"also used to restart warm (default: {bmrs_snapshots.DEFAULT_PATH}).",
+    )
+    parser.add_argument(
+        "--no-snapshots",
+        dest="snapshot_db",
+        action="store_const",
+        const=None,
+        help="Do not persist forecast revisions.",
+    )
+    parser.set_defaults(retry=True, conditional=True, adaptive=True)
 
     return parser.parse_args()
 
@@ -602,12 +1156,35 @@ def parse_args():
 def main():
     args = parse_args()
     os.makedirs(args.output_dir, exist_ok=True)
+    bmrs_client.configure_from_args(args)
+    bmrs_export.configure_from_args(args)
+    bmrs_profile.configure_from_args(args)
+
+    if args.backfill_to:
+        backfill(
+            args.date,
+            args.backfill_to,
+            store_dir=args.store_dir,
+            max_concurrency=args.max_concurrency,
+        )
+        bmrs_client.print_timing_summary()
+        return
+
+    store = bmrs_snapshots.SnapshotStore(args.snapshot_db) if args.snapshot_db else None
+
     auto_update_loop(
         date=args.date,
         update_interval_minutes=args.update_interval_minutes,
         retry=args.retry,
         retry_increments=tuple(args.retry_increments),
         output_dir=args.output_dir,
+        max_concurrency=args.max_concurrency,
+        conditional=args.conditional,
+        do_plot=bmrs_export.wants_figures(),
+        store=store,
+        adaptive=args.adaptive,
+        poll_quantiles=tuple(args.poll_quantiles),
+        backoff_max_minutes=args.backoff_max_minutes,
     )
 
 
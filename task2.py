@@ -1,12 +1,16 @@
 import argparse
-import time
-import datetime as dt
 import os
-import requests as rq
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+import bmrs_cache
+import bmrs_client
+import bmrs_export
+import bmrs_frames
+import bmrs_profile
+
 
 
 
@@ -23,140 +27,111 @@ ft_red = "#c6665c"        # muted salmon red
 ft_green_light = "#e3f2e1"
 ft_red_light   = "#f8dad5"
 
+# Endpoint paths, relative to bmrs_client's base URL
+FORECAST_PATH = "/forecast/generation/wind-and-solar/day-ahead"
+ACTUALS_PATH = "/generation/actual/per-type/wind-and-solar"
+
 def fetch_wind_solar_forecast(date, query_attempt_count=5):
     """
     Fetch day-ahead forecast generation for wind & solar (DGWS / B1440)
-    for a single UTC day.
+    for one local (Europe/Berlin) day, in a single request.
 
     Uses:
       GET /forecast/generation/wind-and-solar/day-ahead
-      filtered by startTime via 'from' and 'to'.
+      filtered by startTime via 'from' and 'to' (the exact UTC window of
+      bmrs_frames.LocalDay(date), 46/48/50 periods).
 
     Parameters
     ----------
     date : str
-        Settlement date in 'YYYY-MM-DD' (UTC).
-        Query attempt: how many times to retry on failure.
+        Local day in 'YYYY-MM-DD'.
+    query_attempt_count : int
+        How many times to try on transient failures (timeouts, 429, 5xx);
+        other errors are not retried.
     """
-    base_url = "https://data.elexon.co.uk/bmrs/api/v1/forecast/generation/wind-and-solar/day-ahead"
-
-    start_iso = f"{date}T00:00Z"
-    end_iso = f"{date}T23:30Z"
+    base_url = bmrs_client.api_url(FORECAST_PATH)
 
     params = {
-        "from": start_iso,
-        "to": end_iso,
+        **bmrs_frames.LocalDay(date).time_params(),
         "processType": "Day ahead",
         "format": "json",
     }
 
-    attempt = 1
-    r = None
-
-    while attempt <= query_attempt_count:
-        try:
-            print(f" Forecast attempt {attempt} ...")
-            r = rq.get(base_url, params=params)
-
-            if r.status_code == 200:
-                print("Forecast request OK.")
-                break
-            else:
-                print(f"Forecast HTTP status: {r.status_code}")
-        except Exception as e:
-            print(f"Forecast attempt {attempt} failed: {e}")
-
-        attempt += 1
-        if attempt <= query_attempt_count:
-            time.sleep(2)
-
-    if r is None or r.status_code != 200:
-        raise Exception(f"Forecast API request failed after {query_attempt_count} attempts")
-
+    r = bmrs_client.get_with_retry(
+        base_url,
+        attempts=query_attempt_count,
+        params=params,
+        label=f"forecast {date}",
+        cache_ttl=bmrs_cache.ttl_for_date(date),
+    )
+    print("Forecast request OK.")
     return r
 
 
 def fetch_wind_solar_actuals(date, query_attempt_count=5):
     """
     Fetch actual/estimated wind & solar generation (AGWS / B1630)
-    for a single UTC day.
+    for one local (Europe/Berlin) day, in a single request.
 
     Uses:
       GET /generation/actual/per-type/wind-and-solar
+      filtered by startTime via 'from' and 'to' (the exact UTC window of
+      bmrs_frames.LocalDay(date); no settlementPeriodFrom/To, which would
+      make from/to settlement dates).
 
     Parameters
     ----------
     date : str
-        Settlement date in 'YYYY-MM-DD' (UTC).
-        Query attempt: how many times to retry on failure.
+        Local day in 'YYYY-MM-DD'.
+    query_attempt_count : int
+        How many times to try on transient failures (timeouts, 429, 5xx);
+        other errors are not retried.
     """
-    base_url = "https://data.elexon.co.uk/bmrs/api/v1/generation/actual/per-type/wind-and-solar"
-
-    date_obj = dt.datetime.strptime(date, "%Y-%m-%d")
-    next_day = date_obj + dt.timedelta(days=1)
-
-    start_iso = date_obj.strftime("%Y-%m-%dT00:00Z")
-    end_iso = next_day.strftime("%Y-%m-%dT00:00Z")
+    base_url = bmrs_client.api_url(ACTUALS_PATH)
 
     params = {
-        "from": start_iso,
-        "to": end_iso,
-        "settlementPeriodFrom": 1,
-        "settlementPeriodTo": 48,
+        **bmrs_frames.LocalDay(date).time_params(),
         "format": "json",
     }
 
-    attempt = 1
-    r = None
-
-    while attempt <= query_attempt_count:
-        try:
-            print(f" Actuals attempt {attempt} ...")
-            r = rq.get(base_url, params=params)
-
-            if r.status_code == 200:
-                print(" Actuals request OK.")
-                break
-            else:
-                print(f"Actuals HTTP status: {r.status_code}")
-        except Exception as e:
-            print(f"Actuals attempt {attempt} failed: {e}")
-
-        attempt += 1
-        if attempt <= query_attempt_count:
-            time.sleep(2)
-
-    if r is None or r.status_code != 200:
-        raise Exception(f"Actuals API request failed after {query_attempt_count} attempts")
-
+    r = bmrs_client.get_with_retry(
+        base_url,
+        attempts=query_attempt_count,
+        params=params,
+        label=f"actuals {date}",
+        cache_ttl=bmrs_cache.ttl_for_date(date),
+    )
+    print(" Actuals request OK.")
     return r
 
 
+@bmrs_profile.stage("decode")
 def forecast_req_to_df(r):
     """
-    Convert forecast JSON response to a DataFrame.
+    Convert forecast JSON response to a typed DataFrame.
     """
-    data = r.json()
-    return pd.DataFrame(data["data"])
+    return bmrs_frames.response_to_df(r, bmrs_frames.WIND_SOLAR_FORECAST_SCHEMA)
 
 
+@bmrs_profile.stage("decode")
 def actuals_req_to_df(r):
     """
-    Convert actuals JSON response to a DataFrame.
+    Convert actuals JSON response to a typed DataFrame.
     """
-    data = r.json()
-    return pd.DataFrame(data["data"])
+    return bmrs_frames.response_to_df(r, bmrs_frames.WIND_SOLAR_ACTUALS_SCHEMA)
 
 
 # =========================================================
 #   Utility / transformation helpers
 # =========================================================
 
-def settlement_period_order():
+def settlement_period_order(date=None):
     """
-    BMRS-style ordering for a local day: 47, 48, 1..46.
+    SP labels by local-day position: 47, 48, 1..46 on a 48-period day,
+    45, 46, 1..46 / 49, 50, 1..46 after a clock change (see
+    bmrs_frames.local_day_labels).
     """
-    return [str(sp) for sp in ([47, 48] + list(range(1, 47)))]
+    return bmrs_frames.local_day_labels(date)
 
 
 def normalise_mw_column(df, new_col_name):
@@ -167,7 +142,6 @@ def normalise_mw_column(df, new_col_name):
       - 'generation'
       - 'value'
     """
-    df = df.copy()
     candidates = ["quantity", "generation", "value"]
 
     src_col = None
@@ -183,7 +157,7 @@ def normalise_mw_column(df, new_col_name):
         )
 
     if src_col != new_col_name:
-        df = df.rename(columns={src_col: new_col_name})
+        df = df.rename(columns={src_col: new_col_name}, copy=False)
 
     return df
 
@@ -212,30 +186,36 @@ def add_fuel_column(df):
     if df is None:
         raise ValueError("DataFrame is None in add_fuel_column().")
 
-    df = df.copy()
-
     if "psrType" not in df.columns:
         raise KeyError(f"Expected 'psrType' column, got: {list(df.columns)}")
 
-    df["fuel"] = df["psrType"].apply(map_psr_to_fuel)
-    df = df[df["fuel"].notna()].reset_index(drop=True)
+    # map() on a categorical psrType runs once per distinct type, not per row
+    fuel = df["psrType"].map(map_psr_to_fuel)
+    keep = fuel.notna().to_numpy()
 
+    # The row selection copies, so the column can be added without one
+    df = bmrs_frames.with_columns(df, {"fuel": fuel}, owned=True)[keep]
+    df.index = pd.RangeIndex(len(df))
     return df
 
 
-def convert_col_to_cest(df, col_names=("startTime",)):
+@bmrs_profile.stage("tz_convert")
+def convert_col_to_cest(df, col_names=("startTime",), owned=False):
     """
     Add *_cest columns for each timestamp column in col_names.
+
+    The result is built on a copy of df unless owned=True, in which case
+    it shares df's columns (bmrs_frames.with_columns). Typed
+    ingestion has already parsed the timestamps (once per distinct string,
+    memoised across calls), so this only converts the zone
+    (bmrs_frames.to_local).
     """
-    df = df.copy()
-    for col in col_names:
-        df[f"{col}_cest"] = (
-            pd.to_datetime(df[col], utc=True)
-            .dt.tz_convert("Europe/Berlin")
-        )
-    return df
+    return bmrs_frames.with_columns(
+        df, {f"{col}_cest": bmrs_frames.to_local(df[col]) for col in col_names}, owned=owned
+    )
 
 
+@bmrs_profile.stage("merge")
 def prepare_wind_solar_merged(forecast_df, actuals_df):
     """
     Align forecast vs actual data.
@@ -247,26 +227,22 @@ def prepare_wind_solar_merged(forecast_df, actuals_df):
         fuel (Wind / Solar)
         diff_MW = actual_MW - forecast_MW
     - Aggregate per (settlementDate, settlementPeriod, fuel).
+    - Add localPeriod / periodKey (bmrs_frames.local_period_columns) and
+      sort by fuel, then periodKey.
     """
-    forecast_df = forecast_df.copy()
-    actuals_df = actuals_df.copy()
-
     if "quantity" not in forecast_df.columns:
         raise KeyError(f"Forecast DF missing 'quantity'; columns: {list(forecast_df.columns)}")
     if "quantity" not in actuals_df.columns:
         raise KeyError(f"Actuals DF missing 'quantity'; columns: {list(actuals_df.columns)}")
 
-    forecast_df["forecast_MW"] = forecast_df["quantity"]
-    actuals_df["actual_MW"] = actuals_df["quantity"]
+    # Derived columns are added without copying the inputs: these frames
+    # only feed the aggregation below, which builds the returned frame
+    forecast_df = bmrs_frames.with_columns(forecast_df, {"forecast_MW": forecast_df["quantity"]}, owned=True)
+    actuals_df = bmrs_frames.with_columns(actuals_df, {"actual_MW": actuals_df["quantity"]}, owned=True)
 
     # Timezone conversion
-    forecast_df = convert_col_to_cest(forecast_df, col_names=("startTime",))
-    actuals_df = convert_col_to_cest(actuals_df, col_names=("startTime",))
-
-    if "settlementPeriod" in forecast_df.columns:
-        forecast_df["settlementPeriod"] = forecast_df["settlementPeriod"].astype(int)
-    if "settlementPeriod" in actuals_df.columns:
-        actuals_df["settlementPeriod"] = actuals_df["settlementPeriod"].astype(int)
+    forecast_df = convert_col_to_cest(forecast_df, col_names=("startTime",), owned=True)
+    actuals_df = convert_col_to_cest(actuals_df, col_names=("startTime",), owned=True)
 
     # Fuel mapping
     forecast_df = add_fuel_column(forecast_df)
@@ -284,7 +260,7 @@ def prepare_wind_solar_merged(forecast_df, actuals_df):
 
     forecast_agg = (
         forecast_df
-        .groupby(group_cols, as_index=False)
+        .groupby(group_cols, as_index=False, observed=True)
         .agg({
             "forecast_MW": "sum",
             "startTime_cest": "min",
@@ -293,7 +269,7 @@ def prepare_wind_solar_merged(forecast_df, actuals_df):
 
     actuals_agg = (
         actuals_df
-        .groupby(group_cols, as_index=False)
+        .groupby(group_cols, as_index=False, observed=True)
         .agg({
             "actual_MW": "sum",
             "startTime_cest": "min",
@@ -313,34 +289,31 @@ def prepare_wind_solar_merged(forecast_df, actuals_df):
 
     merged["diff_MW"] = merged["actual_MW"] - merged["forecast_MW"]
 
-    merged = merged.sort_values(["settlementDate", "fuel", "settlementPeriod"]).reset_index(drop=True)
+    # Integer local-day position / periodKey, used for ordering and axes
+    merged = bmrs_frames.with_columns(merged, bmrs_frames.local_period_columns(merged), owned=True)
+    merged = merged.sort_values(["fuel", "periodKey"], kind="stable").reset_index(drop=True)
 
     return merged
 
 
+@bmrs_profile.stage("split")
 def split_wind_solar(merged_df):
     """
     Split merged_df into separate Wind and Solar DataFrames.
     """
-    merged_df = merged_df.copy()
-
     if "fuel" not in merged_df.columns:
         raise KeyError("'fuel' column not found in merged_df")
 
-    df_wind = merged_df[merged_df["fuel"] == "Wind"].copy()
-    df_solar = merged_df[merged_df["fuel"] == "Solar"].copy()
-
-    for df in (df_wind, df_solar):
-        if not df.empty:
-            df["settlementPeriod"] = df["settlementPeriod"].astype(int)
-
-    return df_wind, df_solar
+    # Boolean selection already yields new frames; no extra copies
+    fuel = merged_df["fuel"].to_numpy()
+    return merged_df[fuel == "Wind"], merged_df[fuel == "Solar"]
 
 
 # =========================================================
 #   Plotting
 # =========================================================
 
+@bmrs_profile.stage("figure")
 def plot_forecast_vs_actual_with_table(df, fuel_label="Wind", x_axis="settlementPeriod", output_dir="."):
     """
     FT-style two-row figure.
@@ -353,31 +326,32 @@ def plot_forecast_vs_actual_with_table(df, fuel_label="Wind", x_axis="settlement
         print(f"{fuel_label}: no data to plot.")
         return
 
-    df = df.copy()
-
     if x_axis not in ("settlementPeriod", "startTime_cest"):
         raise ValueError("x_axis must be 'settlementPeriod' or 'startTime_cest'")
 
     # --- X values and ordering ---
-    if x_axis == "settlementPeriod":
-        # Local day order: 47, 48, 1..46
-        order = settlement_period_order()
-        df["settlementPeriod"] = df["settlementPeriod"].astype(int)
-        df["settlementPeriod_str"] = df["settlementPeriod"].astype(str)
+    if "periodKey" not in df.columns:
+        # df is only read; the sort below builds the frame used from here on
+        df = bmrs_frames.with_columns(df, bmrs_frames.local_period_columns(df), owned=True)
+    df = df.sort_values("periodKey").reset_index(drop=True)
 
-        order_index = {sp: i for i, sp in enumerate(order)}
-        df["sp_sort_key"] = df["settlementPeriod_str"].map(order_index).fillna(len(order))
-
-        df = df.sort_values("sp_sort_key").reset_index(drop=True)
-
-        x_vals = df["settlementPeriod_str"]
+    if x_axis == "settlementPeriod":
+        # Integer local-day position, labelled 47, 48, 1..46 (DST-aware)
+        order = settlement_period_order(bmrs_frames.main_local_day(df["periodKey"]))
+        x_vals = df["localPeriod"]
         x_title = "Settlement Period"
-        category_args = dict(categoryorder="array", categoryarray=order)
+        axis_args = dict(
+            tickmode="array",
+            tickvals=list(range(1, len(order) + 1)),
+            ticktext=order,
+            range=[0.5, len(order) + 0.5],
+        )
     else:
-        df = df.sort_values("startTime_cest").reset_index(drop=True)
         x_vals = df["startTime_cest"]
         x_title = "Local start time"
-        category_args = {}
+        axis_args = {}
+    # Hover shows the settlement period itself, not its position
+    x_hover = "%{customdata}" if x_axis == "settlementPeriod" else "%{x}"
 
     # Local date/time for title from startTime_cest (CE(S)T)
     local_dt = df["startTime_cest"].iloc[0]
@@ -404,8 +378,9 @@ def plot_forecast_vs_actual_with_table(df, fuel_label="Wind", x_axis="settlement
             name=f"{fuel_label} forecast",
             marker=dict(size=7),
             line=dict(width=2, color=ft_red),
+            customdata=df["settlementPeriod"],
             hovertemplate=(
-                f"{x_axis}: %{{x}}<br>"
+                f"{x_axis}: {x_hover}<br>"
                 "Forecast: %{y:.1f} MW<extra></extra>"
             ),
         ),
@@ -421,8 +396,9 @@ def plot_forecast_vs_actual_with_table(df, fuel_label="Wind", x_axis="settlement
             name=f"{fuel_label} actual",
             marker=dict(size=7),
             line=dict(width=2, dash="dot", color=ft_green),
+            customdata=df["settlementPeriod"],
             hovertemplate=(
-                f"{x_axis}: %{{x}}<br>"
+                f"{x_axis}: {x_hover}<br>"
                 "Actual: %{y:.1f} MW<extra></extra>"
             ),
         ),
@@ -466,7 +442,7 @@ def plot_forecast_vs_actual_with_table(df, fuel_label="Wind", x_axis="settlement
         showgrid=False,
         linecolor=axis_col,
         tickfont=dict(color=tick_col),
-        **category_args,
+        **axis_args,
     )
 
     fig.update_xaxes(
@@ -475,29 +451,25 @@ def plot_forecast_vs_actual_with_table(df, fuel_label="Wind", x_axis="settlement
         showgrid=False,
         linecolor=axis_col,
         tickfont=dict(color=tick_col),
-        **category_args,
+        **axis_args,
     )
 
     # Table – same ordering as df
         # Table – same ordering as df
-    table_df = df[["settlementPeriod", "forecast_MW", "actual_MW", "diff_MW"]].copy()
-
-    table_df["forecast_MW"] = table_df["forecast_MW"].round(1)
-    table_df["actual_MW"] = table_df["actual_MW"].round(1)
-    table_df["diff_MW"] = table_df["diff_MW"].round(1)
+    table_df = pd.DataFrame({
+        "settlementPeriod": df["settlementPeriod"],
+        "forecast_MW": df["forecast_MW"].round(1),
+        "actual_MW": df["actual_MW"].round(1),
+        "diff_MW": df["diff_MW"].round(1),
+    })
 
     # Row-wise colours based on forecast error (Actual - Forecast)
-    row_colors = []
-    for v in table_df["diff_MW"]:
-        try:
-            if pd.isna(v):
-                row_colors.append(plot_bg)
-            elif v >= 0:
-                row_colors.append(ft_green_light)
-            else:
-                row_colors.append(ft_red_light)
-        except Exception:
-            row_colors.append(plot_bg)
+    diff_sign = bmrs_frames.sign_labels(table_df["diff_MW"])
+    row_colors = np.select(
+        [diff_sign == "Positive", diff_sign == "Negative"],
+        [ft_green_light, ft_red_light],
+        default=plot_bg,
+    ).tolist()
 
     fig.add_trace(
         go.Table(
@@ -528,31 +500,21 @@ def plot_forecast_vs_actual_with_table(df, fuel_label="Wind", x_axis="settlement
     base = f"forecast_vs_actual_{fuel_label.lower()}_{date_str.replace(' ', '_')}"
     base = os.path.join(output_dir, base)
 
-    try:
-        fig_png = go.Figure(fig)  
-
-        n_rows = len(table_df)
-        cell_height = 20    
-        header_height = 24  
-        table_fraction = 0.35 
-
-        needed_table_px = header_height + n_rows * cell_height
-        fig_height = int(needed_table_px / table_fraction) + 200 
+    n_rows = len(table_df)
+    cell_height = 20
+    header_height = 24
+    table_fraction = 0.35
 
-        fig_png.update_layout(width=1600, height=fig_height)
-        fig_png.write_image(base + ".png", scale=2)
-        print(f"Saved PNG:  {base}.png")
-    except Exception as e:
-        print(f"FAILED TO SAVE PNG IMAGE ({base}.png): {e}")
+    needed_table_px = header_height + n_rows * cell_height
+    fig_height = int(needed_table_px / table_fraction) + 200
 
-    
-    fig.write_html(base + ".html", include_plotlyjs="cdn")
-    print(f"Saved HTML: {base}.html")
+    bmrs_export.export_figure(fig, base, width=1600, height=fig_height, scale=2, data=df)
 
-    fig.show()
+    bmrs_export.show(fig)
 
 
 
+@bmrs_profile.stage("error_summary")
 def print_forecast_error_summary(df, fuel_label="Wind"):
     """
     Simple stats for commentary.
@@ -578,51 +540,38 @@ def print_forecast_error_summary(df, fuel_label="Wind"):
 #   Main runner
 # =========================================================
 
-def run_part2_wind_solar(date, do_plots=True, x_axis="settlementPeriod", output_dir="."):
+@bmrs_profile.run("run_part2_wind_solar")
+def run_part2_wind_solar(
+    date,
+    do_plots=True,
+    x_axis="settlementPeriod",
+    output_dir=".",
+    max_concurrency=bmrs_client.DEFAULT_MAX_CONCURRENCY,
+):
     """
     Fetch, align, plot, and summarise wind/solar forecast vs actuals
     for a local (Europe/Berlin) calendar day.
 
-    Local day D (00:00–23:30) uses:
-      - SP 47–48 from previous UTC settlementDate
-      - SP 1–46 from the selected UTC settlementDate
+    Local day D (00:00–24:00 local) is the UTC window of
+    bmrs_frames.LocalDay(D): SP 47–48 of the previous settlementDate and
+    SP 1–46 of D on a normal day, 46 or 50 periods around clock changes.
+    Both endpoints filter on startTime, so forecast and actuals take one
+    request each (sent concurrently, at most max_concurrency at a time)
+    and nothing has to be filtered out afterwards.
     """
     print(f"Part 2 – wind & solar forecast vs actuals for local day {date}")
 
-    # Previous day (for SP 47–48) and current day (SP 1–46)
-    date_obj = dt.datetime.strptime(date, "%Y-%m-%d")
-    prev_obj = date_obj - dt.timedelta(days=1)
-    prev_str = prev_obj.strftime("%Y-%m-%d")
-
-    # --- Forecasts: previous day (47–48) + current day (1–46) ---
-    r_fore_prev = fetch_wind_solar_forecast(prev_str)
-    r_fore_curr = fetch_wind_solar_forecast(date)
-
-    df_fore_prev = forecast_req_to_df(r_fore_prev)
-    df_fore_curr = forecast_req_to_df(r_fore_curr)
-
-    df_fore_prev["settlementPeriod"] = df_fore_prev["settlementPeriod"].astype(int)
-    df_fore_curr["settlementPeriod"] = df_fore_curr["settlementPeriod"].astype(int)
-
-    df_fore_prev_sel = df_fore_prev[df_fore_prev["settlementPeriod"].isin([47, 48])]
-    df_fore_curr_sel = df_fore_curr[df_fore_curr["settlementPeriod"].between(1, 46)]
-
-    df_fore_local = pd.concat([df_fore_prev_sel, df_fore_curr_sel], ignore_index=True)
-
-    # --- Actuals: previous day (47–48) + current day (1–46) ---
-    r_act_prev = fetch_wind_solar_actuals(prev_str)
-    r_act_curr = fetch_wind_solar_actuals(date)
-
-    df_act_prev = actuals_req_to_df(r_act_prev)
-    df_act_curr = actuals_req_to_df(r_act_curr)
-
-    df_act_prev["settlementPeriod"] = df_act_prev["settlementPeriod"].astype(int)
-    df_act_curr["settlementPeriod"] = df_act_curr["settlementPeriod"].astype(int)
-
-    df_act_prev_sel = df_act_prev[df_act_prev["settlementPeriod"].isin([47, 48])]
-    df_act_curr_sel = df_act_curr[df_act_curr["settlementPeriod"].between(1, 46)]
+    with bmrs_profile.stage("fetch"):
+        r_fore, r_act = bmrs_client.run_concurrently(
+            [
+                lambda: fetch_wind_solar_forecast(date),
+                lambda: fetch_wind_solar_actuals(date),
+            ],
+            max_concurrency=max_concurrency,
+        )
 
-    df_act_local = pd.concat([df_act_prev_sel, df_act_curr_sel], ignore_index=True)
+    df_fore_local = forecast_req_to_df(r_fore)
+    df_act_local = actuals_req_to_df(r_act)
 
     print(f"Forecast rows (local day): {len(df_fore_local)}")
     print(f"Actual rows   (local day): {len(df_act_local)}")
@@ -635,8 +584,10 @@ def run_part2_wind_solar(date, do_plots=True, x_axis="settlementPeriod", output_
     print(f"Solar rows (merged): {len(df_solar)}")
 
     if do_plots:
-        plot_forecast_vs_actual_with_table(df_wind, fuel_label="Wind", x_axis=x_axis, output_dir=output_dir)
-        plot_forecast_vs_actual_with_table(df_solar, fuel_label="Solar", x_axis=x_axis, output_dir=output_dir)
+        # Both PNGs are rendered together when the batch closes
+        with bmrs_export.batch():
+            plot_forecast_vs_actual_with_table(df_wind, fuel_label="Wind", x_axis=x_axis, output_dir=output_dir)
+            plot_forecast_vs_actual_with_table(df_solar, fuel_label="Solar", x_axis=x_axis, output_dir=output_dir)
 
     print_forecast_error_summary(df_wind, fuel_label="Wind")
     print_forecast_error_summary(df_solar, fuel_label="Solar")
@@ -644,6 +595,87 @@ def run_part2_wind_solar(date, do_plots=True, x_axis="settlementPeriod", output_
     return df_wind, df_solar
 
 
+# =========================================================
+#   Watch mode
+# =========================================================
+
+WIND_SOLAR_KINDS = {
+    "forecast": (fetch_wind_solar_forecast, forecast_req_to_df),
+    "actuals": (fetch_wind_solar_actuals, actuals_req_to_df),
+}
+WIND_SOLAR_KEY_COLS = ["psrType", "settlementDate", "settlementPeriod"]
+
+
+class WindSolarWatch:
+    """
+    Re-fetch the wind/solar forecast or actuals for one local day every
+    `poll_minutes` and publish what changed since the previous poll.
+
+    kind is "forecast" or "actuals". Polls are jobs on a shared
+    bmrs_scheduler.Scheduler; `publish(name, diff_df)` receives the
+    per-(psrType, SP) quantity changes (bmrs_frames.diff_frames).
+    """
+
+    def __init__(
+        self,
+        kind,
+        date,
+        scheduler,
+        poll_minutes=30,
+        publish=None,
+    ):
+        if kind not in WIND_SOLAR_KINDS:
+            raise ValueError(f"Unknown wind/solar watch kind {kind!r} (expected one of {sorted(WIND_SOLAR_KINDS)})")
+        self.kind = kind
+        self.date = date
+        self.scheduler = scheduler
+        self.poll_interval_s = poll_minutes * 60
+        self.publish = publish
+        self.name = f"wind-solar-{kind} {date}"
+
+        self.df = None
+        self._job = None
+
+    def start(self):
+        self._job = self.scheduler.call_later(0, self._poll, name=self.name)
+
+    def stop(self):
+        if self._job is not None:
+            self.scheduler.cancel(self._job)
+            self._job = None
+
+    def fetch(self):
+        """
+        Current local-day rows for this watch's kind and date.
+        """
+        fetch, to_df = WIND_SOLAR_KINDS[self.kind]
+        return to_df(fetch(self.date))
+
+    def _poll(self):
+        try:
+            df = self.fetch()
+        except Exception as e:
+            print(f" [{self.name}] fetch failed: {e}")
+            df = None
+
+        if df is not None:
+            if self.df is None:
+                print(f" [{self.name}] initial snapshot: {len(df)} rows")
+            else:
+                # A failed diff or publish must not end the watch
+                try:
+                    diff = bmrs_frames.diff_frames(self.df, df, WIND_SOLAR_KEY_COLS, "quantity")
+                    if diff.empty:
+                        print(f" [{self.name}] no changes")
+                    elif self.publish is not None:
+                        self.publish(self.name, diff)
+                except Exception as e:
+                    print(f" [{self.name}] publish failed: {e}")
+            self.df = df
+
+        self._job = self.scheduler.call_later(self.poll_interval_s, self._poll, name=self.name)
+
+
 # =========================================================
 #   CLI
 # =========================================================
@@ -656,7 +688,9 @@ def parse_args():
         "--date",
         default="2025-11-11",
         help="Local (Europe/Berlin) calendar day (YYYY-MM-DD). "
-             "Will use SP 47–48 from previous UTC day and 1–46 from this UTC day.",
+             "Will use SP 47–48 from previous UTC day and 1–46 from this UTC day "
+             "(45–46 / 49–50 and 1–44 / 1–48 around clock changes), fetched as one "
+             "startTime window per endpoint.",
     )
     parser.add_argument(
         "--x-axis",
@@ -676,6 +710,9 @@ def parse_args():
         default=".",
         help="Directory to save output plots (default: current directory).",
     )
+    bmrs_client.add_cli_arguments(parser)
+    bmrs_export.add_cli_arguments(parser)
+    bmrs_profile.add_cli_arguments(parser)
     parser.set_defaults(do_plots=True)
 
     return parser.parse_args()
@@ -683,14 +720,20 @@ def parse_args():
 
 def main():
     args = parse_args()
+    bmrs_client.configure_from_args(args)
+    bmrs_export.configure_from_args(args)
+    bmrs_profile.configure_from_args(args)
 
     run_part2_wind_solar(
         date=args.date,
-        do_plots=args.do_plots,
+        do_plots=args.do_plots and bmrs_export.wants_figures(),
         x_axis=args.x_axis,
         output_dir=args.output_dir,
+        max_concurrency=args.max_concurrency,
     )
 
+    bmrs_client.print_timing_summary()
+
 
 if __name__ == "__main__":
     main()
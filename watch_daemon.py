@@ -0,0 +1,313 @@
+"""
+Watch daemon: one process polling several (endpoint, date) pairs.
+
+Each watch is a self-rescheduling job on one bmrs_scheduler.Scheduler, so
+all of them share the HTTP connection pool, the response cache and one
+request rate limit (bmrs_client). Watch kinds:
+
+  imbalance            indicated imbalance evolution (task1.ImbalanceWatch)
+  wind-solar-forecast  day-ahead wind/solar forecast  (task2.WindSolarWatch)
+  wind-solar-actuals   wind/solar outturn             (task2.WindSolarWatch)
+
+A watch is given as KIND:DATE, where DATE is YYYY-MM-DD, today, tomorrow
+or yesterday (UTC). Relative dates roll over at UTC midnight. Every change a
+watch sees is printed and appended as one JSON line to
+<output_dir>/watch_diffs.jsonl.
+
+Usage:
+    python watch_daemon.py --watch imbalance:today imbalance:tomorrow \\
+        wind-solar-forecast:tomorrow wind-solar-actuals:today --rate-limit 5
+"""
+import argparse
+import datetime as dt
+import json
+import os
+
+import bmrs_client
+import bmrs_export
+import bmrs_polling
+import bmrs_profile
+import bmrs_scheduler
+import bmrs_snapshots
+import task1
+import task2
+
+
+WATCH_KINDS = ("imbalance", "wind-solar-forecast", "wind-solar-actuals")
+RELATIVE_DATES = {"yesterday": -1, "today": 0, "tomorrow": 1}
+
+DEFAULT_WATCHES = [
+    "imbalance:today",
+    "imbalance:tomorrow",
+    "wind-solar-forecast:today",
+    "wind-solar-forecast:tomorrow",
+    "wind-solar-actuals:today",
+]
+DIFF_LOG = "watch_diffs.jsonl"
+
+
+def parse_watch(spec):
+    """
+    'KIND:DATE' -> (kind, date_spec). Raises ValueError for unknown kinds
+    or malformed dates.
+    """
+    kind, sep, date_spec = spec.partition(":")
+    if not sep or kind not in WATCH_KINDS:
+        raise ValueError(f"Bad watch {spec!r}: expected KIND:DATE with KIND in {', '.join(WATCH_KINDS)}")
+    if date_spec not in RELATIVE_DATES:
+        dt.datetime.strptime(date_spec, "%Y-%m-%d")
+    return kind, date_spec
+
+
+def resolve_date(date_spec, now=None):
+    """
+    Settlement date ('YYYY-MM-DD') for an absolute or relative date spec.
+    """
+    if date_spec not in RELATIVE_DATES:
+        return date_spec
+    now = now or dt.datetime.now(dt.timezone.utc)
+    return (now.date() + dt.timedelta(days=RELATIVE_DATES[date_spec])).isoformat()
+
+
+class DiffPublisher:
+    """
+    Prints each watch's changes and appends them to a JSONL log.
+    """
+
+    def __init__(self, output_dir="."):
+        os.makedirs(output_dir, exist_ok=True)
+        self.path = os.path.join(output_dir, DIFF_LOG)
+
+    def __call__(self, name, diff_df):
+        print(f" [{name}] {len(diff_df)} change(s) published")
+        record = {
+            "watch": name,
+            "published_at": dt.datetime.now(dt.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "changes": json.loads(diff_df.to_json(orient="records", date_format="iso")),
+        }
+        with open(self.path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+class WatchDaemon:
+    """
+    Starts one watch per (kind, date_spec) on a shared scheduler and
+    restarts relative-date watches when the UTC date changes.
+    """
+
+    def __init__(
+        self,
+        watch_specs,
+        scheduler,
+        publish,
+        output_dir=".",
+        update_interval_minutes=30,
+        retry_increments=(30, 60, 120),
+        poll_minutes=30,
+        max_concurrency=bmrs_client.DEFAULT_MAX_CONCURRENCY,
+        store=None,
+        adaptive=True,
+        poll_quantiles=bmrs_polling.DEFAULT_QUANTILES,
+    ):
+        self.watch_specs = list(dict.fromkeys(watch_specs))
+        self.scheduler = scheduler
+        self.publish = publish
+        self.output_dir = output_dir
+        self.update_interval_minutes = update_interval_minutes
+        self.retry_increments = tuple(retry_increments)
+        self.poll_minutes = poll_minutes
+        self.max_concurrency = max_concurrency
+        self.store = store
+        self.adaptive = adaptive
+        self.poll_quantiles = tuple(poll_quantiles)
+
+        self.watches = {}   # (kind, date_spec) -> (resolved date, watch)
+        self._restarts = {}  # (kind, date_spec) -> pending restart Job
+        self._rollover_job = None
+
+    def _make_watch(self, kind, date):
+        if kind == "imbalance":
+            return task1.ImbalanceWatch(
+                date,
+                self.scheduler,
+                update_interval_minutes=self.update_interval_minutes,
+                retry_increments=self.retry_increments,
+                output_dir=self.output_dir,
+                max_concurrency=self.max_concurrency,
+                do_plot=bmrs_export.wants_figures(),
+                store=self.store,
+                publish=self.publish,
+                adaptive=self.adaptive,
+                poll_quantiles=self.poll_quantiles,
+            )
+        return task2.WindSolarWatch(
+            kind.replace("wind-solar-", ""),
+            date,
+            self.scheduler,
+            poll_minutes=self.poll_minutes,
+            publish=self.publish,
+        )
+
+    def _start_watch(self, kind, date_spec, date):
+        # Supersedes any restart still pending for this key (e.g. for the
+        # date it had before a rollover)
+        self._cancel_restart((kind, date_spec))
+        print(f"\n Starting watch {kind}:{date}")
+        watch = self._make_watch(kind, date)
+        self.watches[(kind, date_spec)] = (date, watch)
+        try:
+            watch.start()
+        except Exception as e:
+            # e.g. initial fetch failed; try the whole watch again later
+            print(f" Watch {kind}:{date} failed to start: {e}")
+            watch.stop()
+            self._restarts[(kind, date_spec)] = self.scheduler.call_later(
+                self.poll_minutes * 60, self._start_watch, kind, date_spec, date,
+                name=f"restart {kind}:{date}",
+            )
+
+    def _cancel_restart(self, key):
+        job = self._restarts.pop(key, None)
+        if job is not None:
+            self.scheduler.cancel(job)
+
+    def start(self):
+        for kind, date_spec in self.watch_specs:
+            self._start_watch(kind, date_spec, resolve_date(date_spec))
+        self._schedule_rollover()
+
+    def stop(self):
+        """
+        Stop every watch and drop pending restarts and the rollover.
+        """
+        for key, (_, watch) in self.watches.items():
+            self._cancel_restart(key)
+            watch.stop()
+        if self._rollover_job is not None:
+            self.scheduler.cancel(self._rollover_job)
+            self._rollover_job = None
+
+    def _schedule_rollover(self):
+        if not any(spec in RELATIVE_DATES for _, spec in self.watch_specs):
+            return
+        now = dt.datetime.now(dt.timezone.utc)
+        midnight = dt.datetime.combine(now.date() + dt.timedelta(days=1), dt.time(), tzinfo=dt.timezone.utc)
+        self._rollover_job = self.scheduler.call_at(midnight, self._rollover, name="date rollover")
+
+    def _rollover(self):
+        for (kind, date_spec), (date, watch) in list(self.watches.items()):
+            new_date = resolve_date(date_spec)
+            if new_date != date:
+                print(f"\n Rolling watch {kind}:{date_spec} from {date} to {new_date}")
+                watch.stop()
+                self._start_watch(kind, date_spec, new_date)
+        self._schedule_rollover()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Watch several BMRS endpoints/dates in one process and publish their changes.",
+    )
+    parser.add_argument(
+        "--watch",
+        nargs="+",
+        default=DEFAULT_WATCHES,
+        metavar="KIND:DATE",
+        help=f"Watches to run; KIND in {{{', '.join(WATCH_KINDS)}}}, DATE is YYYY-MM-DD, "
+             f"today, tomorrow or yesterday (default: {' '.join(DEFAULT_WATCHES)}).",
+    )
+    parser.add_argument(
+        "--update-interval-minutes",
+        type=int,
+        default=30,
+        help="Minutes between expected imbalance forecast updates (default: 30).",
+    )
+    parser.add_argument(
+        "--retry-increments",
+        type=int,
+        nargs="+",
+        default=[30, 60, 120],
+        help="Imbalance retry delays in seconds (default: 30 60 120).",
+    )
+    parser.add_argument(
+        "--poll-quantiles",
+        type=float,
+        nargs="+",
+        default=list(bmrs_polling.DEFAULT_QUANTILES),
+        help="Imbalance watches poll at these quantiles of the learned publish lag (default: 0.5 0.9).",
+    )
+    parser.add_argument(
+        "--fixed-poll",
+        dest="adaptive",
+        action="store_false",
+        help="Imbalance watches use the fixed interval/retry schedule instead of learning it.",
+    )
+    parser.add_argument(
+        "--poll-minutes",
+        type=float,
+        default=30,
+        help="Polling interval for wind/solar watches (default: 30).",
+    )
+    parser.add_argument(
+        "-o", "--output-dir",
+        default=".",
+        help="Directory for plots and the diff log (default: current directory).",
+    )
+    parser.add_argument(
+        "--snapshot-db",
+        default=bmrs_snapshots.DEFAULT_PATH,
+        help=f"SQLite revision store for imbalance watches (default: {bmrs_snapshots.DEFAULT_PATH}).",
+    )
+    parser.add_argument(
+        "--no-snapshots",
+        dest="snapshot_db",
+        action="store_const",
+        const=None,
+        help="Do not persist imbalance revisions.",
+    )
+    bmrs_client.add_cli_arguments(parser)
+    bmrs_export.add_cli_arguments(parser)
+    bmrs_profile.add_cli_arguments(parser)
+
+    args = parser.parse_args()
+    try:
+        args.watch = [parse_watch(spec) for spec in args.watch]
+    except ValueError as e:
+        parser.error(str(e))
+    return args
+
+
+def main():
+    args = parse_args()
+    bmrs_client.configure_from_args(args)
+    bmrs_export.configure_from_args(args)
+    bmrs_profile.configure_from_args(args)
+    bmrs_export.configure(headless=True)    # a daemon never opens figures
+
+    if bmrs_export.wants("png") and bmrs_export.start_renderer():
+        print(" PNG renderer started (shared by all watches).")
+
+    store = bmrs_snapshots.SnapshotStore(args.snapshot_db) if args.snapshot_db else None
+    scheduler = bmrs_scheduler.Scheduler()
+    daemon = WatchDaemon(
+        args.watch,
+        scheduler,
+        publish=DiffPublisher(args.output_dir),
+        output_dir=args.output_dir,
+        update_interval_minutes=args.update_interval_minutes,
+        retry_increments=args.retry_increments,
+        poll_minutes=args.poll_minutes,
+        max_concurrency=args.max_concurrency,
+        store=store,
+        adaptive=args.adaptive,
+        poll_quantiles=args.poll_quantiles,
+    )
+    daemon.start()
+    scheduler.run()
+    daemon.stop()
+
+    bmrs_client.print_timing_summary()
+
+
+if __name__ == "__main__":
+    main()